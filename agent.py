@@ -2,33 +2,419 @@
 AI Focus Agent with OpenAI/Claude integration and personality system.
 """
 import os
-from typing import Dict, List, Optional, Union
+import time
+import random
+import asyncio
+import hashlib
+import threading
+import importlib.util
+from difflib import SequenceMatcher
+from collections import OrderedDict
+from functools import lru_cache, wraps
+from typing import Any, AsyncIterator, Dict, List, Optional, Union, Tuple
 from datetime import datetime
 import json
+import re
+try:
+    # C-accelerated decoder for LLM responses; its JSONDecodeError subclasses json's
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+try:
+    from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+except ImportError:
+    retry = None
+
+
+# Shared event loop for the async LLM clients. Gradio invokes handlers from
+# worker threads, so sync callers hand their coroutines to this loop instead of
+# spinning up (and tearing down) a fresh loop per call with asyncio.run().
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _agent_loop() -> asyncio.AbstractEventLoop:
+    """Return the shared agent event loop, starting its thread on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="focusflow-agent-loop", daemon=True).start()
+    return _loop
+
+
+def _run_sync(coro):
+    """Run a coroutine on the shared agent event loop and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, _agent_loop()).result()
+
+
+# The pooled HTTP client, the probe lock and in-flight/refresh tasks all belong
+# to the agent loop, so async entry points awaited from any other loop hop onto it.
+def _on_agent_loop(method):
+    """Run an async agent method on the agent loop, whichever loop awaits it."""
+    @wraps(method)
+    async def wrapper(*args, **kwargs):
+        loop = _agent_loop()
+        if asyncio.get_running_loop() is loop:
+            return await method(*args, **kwargs)
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(method(*args, **kwargs), loop))
+    return wrapper
+
+
+def _streamed_on_agent_loop(method):
+    """_on_agent_loop for async generators: items are relayed to the caller's loop as they arrive."""
+    @wraps(method)
+    async def wrapper(*args, **kwargs):
+        loop = _agent_loop()
+        caller = asyncio.get_running_loop()
+        if caller is loop:
+            async for item in method(*args, **kwargs):
+                yield item
+            return
+
+        items: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        async def pump():
+            async for item in method(*args, **kwargs):
+                caller.call_soon_threadsafe(items.put_nowait, item)
+
+        future = asyncio.run_coroutine_threadsafe(pump(), loop)
+        future.add_done_callback(lambda _: caller.call_soon_threadsafe(items.put_nowait, done))
+        try:
+            while (item := await items.get()) is not done:
+                yield item
+            # Re-raise anything the stream failed with
+            future.result()
+        finally:
+            future.cancel()
+    return wrapper
+
+
+# SDK clients are cached per (provider, api_key, base_url) and all share one
+# pooled HTTP client, so re-initializing an agent reuses warm keep-alive
+# connections instead of paying a fresh TCP + TLS handshake.
+_http_client = None
+_CLIENT_CACHE: Dict[tuple, Any] = {}
+_client_lock = threading.Lock()
+
+
+def _get_http_client():
+    """Return the process-wide pooled async HTTP client."""
+    global _http_client
+    if _http_client is None:
+        import httpx
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+            http2=importlib.util.find_spec("h2") is not None,
+            timeout=httpx.Timeout(30.0, connect=5.0),
+        )
+    return _http_client
+
+
+# HTTP statuses worth retrying: rate limits, server errors and Anthropic's 529 overload.
+_RETRY_STATUSES = {429, 500, 502, 503, 504, 529}
+
+# When tenacity drives retries, the SDKs' own retry loops are switched off so
+# a 429 isn't retried three times per attempt. Every provider call must then
+# go through _with_retry (or _call_with_retry), or it gets no retries at all.
+_SDK_MAX_RETRIES = 0 if retry else 2
+
+
+def _is_transient(error: BaseException) -> bool:
+    """True for provider errors that a retry can plausibly fix."""
+    import anthropic
+    import openai
+    if isinstance(error, (openai.APIConnectionError, anthropic.APIConnectionError)):
+        return True
+    # OpenAI/Anthropic expose status_code; google.api_core errors expose code
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    return status in _RETRY_STATUSES
+
+
+def _with_retry(func):
+    """Retry transient provider errors with jittered exponential backoff."""
+    if retry is None:
+        return func
+    return retry(
+        wait=wait_exponential_jitter(1, 8),
+        stop=stop_after_attempt(3),
+        retry=retry_if_exception(_is_transient),
+        reraise=True
+    )(func)
+
+
+@_with_retry
+async def _call_with_retry(call, *args, **kwargs):
+    """Await one provider API call under the same retry policy as FocusAgent._chat."""
+    return await call(*args, **kwargs)
+
+
+def _make_client(provider: str, api_key: str, base_url: Optional[str] = None, timeout=None):
+    """Get (or create and cache) the async SDK client for a provider."""
+    key = (provider, api_key, base_url)
+    with _client_lock:
+        client = _CLIENT_CACHE.get(key)
+        if client is None:
+            if provider == "anthropic":
+                from anthropic import AsyncAnthropic
+                client = AsyncAnthropic(api_key=api_key, http_client=_get_http_client(),
+                                        max_retries=_SDK_MAX_RETRIES)
+            else:
+                from openai import AsyncOpenAI
+                kwargs = {"timeout": timeout} if timeout is not None else {}
+                client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=_get_http_client(),
+                                     max_retries=_SDK_MAX_RETRIES, **kwargs)
+            _CLIENT_CACHE[key] = client
+    return client
+
+
+# Small AWQ-quantized model: verdicts are short, so a 4-bit 1.5B model keeps
+# local checks fast while vLLM batches concurrent requests together.
+DEFAULT_VLLM_MODEL = "Qwen/Qwen2.5-1.5B-Instruct-AWQ"
+
+# Static instructions are sent as the system prompt, ahead of the per-call
+# task/activity text, so provider-side prefix caches can reuse them.
+ANALYSIS_SYSTEM_PROMPT = """You are FocusFlow, a Duolingo-style accountability buddy for developers.
+
+Decide whether the developer's recent file activity matches their current task and reply with ONE verdict:
+- "On Track": activity related to the task. Be encouraging and specific (e.g., "Great job! I see you're working on the login form!")
+- "Distracted": files unrelated to the task are being edited. Be playfully sassy (e.g., "Wait, why are you editing random_file.py? We're building a Snake game! 🤨")
+- "Idle": no activity. Be gently nudging (e.g., "Files won't write themselves. *Hoot hoot.* 🦉")
+
+Respond in JSON: {"verdict": "<one of the above>", "message": "1-2 sentences", "reasoning": "a few words"}"""
+
+# Per-call user message templates, filled with str.format_map().
+_PROMPT_NO_ACTIVITY = """**Current Task:**
+- Title: {title}
+- Description: {description}
+
+**Recent Activity:** No file changes detected in the last 60 seconds."""
+
+_PROMPT_WITH_ACTIVITY = """**Current Task:**
+- Title: {title}
+- Description: {description}
+
+**Recent File Activity (last 60 seconds):**
+{activity}"""
+
+ONBOARDING_SYSTEM_PROMPT = """You are FocusFlow, an AI project planner.
+
+Break the user's project down into 5-8 concrete, actionable micro-tasks. Each task should be:
+- Specific and achievable in 15-30 minutes
+- Ordered logically (setup → core features → polish)
+- Clearly described
+
+Respond in JSON: {"tasks": [{"title": "...", "description": "...", "estimated_duration": "15 min"}]}"""
+
+# Output budgets: a verdict is two short sentences, a plan 5-8 brief tasks.
+ANALYSIS_MAX_TOKENS = 120
+ONBOARDING_MAX_TOKENS = 500
+
+# JSON schemas for structured output, so providers return valid JSON directly.
+VERDICT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "verdict": {"type": "string", "enum": ["On Track", "Distracted", "Idle"]},
+        "message": {"type": "string"},
+        "reasoning": {"type": "string"}
+    },
+    "required": ["verdict", "message", "reasoning"],
+    "additionalProperties": False
+}
+
+ONBOARDING_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "tasks": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},
+                    "description": {"type": "string"},
+                    "estimated_duration": {"type": "string"}
+                },
+                "required": ["title", "description", "estimated_duration"],
+                "additionalProperties": False
+            }
+        }
+    },
+    "required": ["tasks"],
+    "additionalProperties": False
+}
+
+# Pulls the JSON payload out of a ```json fenced block in one pass.
+_FENCE_RE = re.compile(r"```(?:json)?\s*(\{.*\}|\[.*\])\s*```", re.DOTALL)
+
+
+def _extract_json(content: str) -> str:
+    """Strip markdown code fences around a JSON payload, if present."""
+    match = _FENCE_RE.search(content)
+    return match.group(1) if match else content.strip()
+
+
+def _parse_json(content: str) -> Any:
+    """Decode a (possibly fenced) JSON completion."""
+    return _json_loads(_extract_json(content))
+
+
+def _planning_prompt(project_description: str) -> str:
+    """Per-project user message for the onboarding planner."""
+    return f'The user wants to build: "{project_description}"'
+
+
+# Opening of the "message" string in a partial JSON stream, and the run of
+# complete characters inside it. The run stops before an escape that hasn't
+# fully arrived; a \u escape needs its four hex digits, and a high surrogate
+# its low half, or the run can't be decoded.
+_MESSAGE_KEY_RE = re.compile(r'"message"\s*:\s*"')
+_MESSAGE_BODY_RE = re.compile(
+    r'(?:[^"\\]|\\[^u]|\\u[dD][89abAB][0-9a-fA-F]{2}\\u[0-9a-fA-F]{4}'
+    r'|\\u(?![dD][89abAB])[0-9a-fA-F]{4})*'
+)
+
+# The last few activity events as hashable (type, filename, content) rows,
+# with content already truncated to what the prompt shows.
+ActivityWindow = Tuple[Tuple[str, str, str], ...]
+
+
+ACTIVITY_WINDOW_FILES = 5
+
+
+def _compact_activity(recent_activity: List[Dict]) -> ActivityWindow:
+    """
+    Reduce the activity list to the compact window used for prompts and caching:
+    the latest event for each of the ACTIVITY_WINDOW_FILES most recently touched files.
+    """
+    # Repeated saves of one file otherwise crowd the window with near-identical
+    # excerpts; keeping one entry per file leaves room for the rest of the working set.
+    latest: Dict[str, Dict] = {}
+    for event in reversed(recent_activity):
+        key = event.get('path') or event['filename']
+        if key not in latest:
+            latest[key] = event
+            if len(latest) == ACTIVITY_WINDOW_FILES:
+                break
+    # Watchers attach a precomputed 'summary'; slice content only for older events
+    return tuple(
+        (event['type'], event['filename'],
+         event['summary'] if 'summary' in event else event.get('content', 'N/A')[:200])
+        for event in reversed(latest.values())
+    )
+
+
+def _transition_key(active_task: Dict, activity: ActivityWindow) -> Tuple:
+    """Task plus the (event type, filename) sequence, ignoring file content."""
+    return (active_task.get('id'), tuple(event[:2] for event in activity))
+
+
+@lru_cache(maxsize=256)
+def _format_activity(activity: ActivityWindow) -> str:
+    """Render an activity window as the prompt's bullet list."""
+    return "\n".join(
+        f"- {event_type.upper()}: {filename}\n  Content: {content}"
+        for event_type, filename, content in activity
+    )
+
+
+# Words too common in task titles/filenames to count as evidence of focus.
+_STOPWORDS = frozenset({
+    "a", "an", "and", "the", "to", "of", "for", "in", "on", "with", "by", "at", "from",
+    "add", "build", "create", "make", "fix", "set", "up", "setup", "update", "write", "implement",
+    "file", "files", "new", "test", "tests", "main", "index", "app", "src", "readme",
+    "py", "js", "jsx", "ts", "tsx", "html", "css", "json", "md", "txt", "yaml", "yml", "toml",
+})
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+@lru_cache(maxsize=64)
+def _task_tokens(title: str, description: str) -> frozenset:
+    """Meaningful lowercase words from a task's title and description."""
+    return frozenset(_TOKEN_RE.findall(f"{title} {description}".lower())) - _STOPWORDS
+
+
+def _quick_verdict(active_task: Dict, activity: ActivityWindow) -> Optional[Dict]:
+    """
+    Decide obvious cases locally: no activity is Idle, and activity where every
+    filename shares a word with the task is On Track. Returns None otherwise.
+    """
+    if not activity:
+        return {
+            "verdict": "Idle",
+            "message": "Files won't write themselves. *Hoot hoot.* 🦉",
+            "reasoning": "No recent activity (local check)"
+        }
+
+    task_tokens = _task_tokens(active_task.get('title') or "", active_task.get('description') or "")
+    if not task_tokens:
+        return None
+    for _, filename, _ in activity:
+        if not task_tokens & set(_TOKEN_RE.findall(filename.lower())):
+            return None
+
+    return {
+        "verdict": "On Track",
+        "message": f"Great job! I see you're working on {activity[-1][1]}! 🎯",
+        "reasoning": "Edited files match the task (local check)"
+    }
+
+
+# FocusAgent packs its idle (low) and distracted (high) streaks into one int.
+_COUNT_MASK = 0xFFFF
+
+# Canned responses for checks that never reach the LLM; callers add a timestamp.
+_IDLE_NO_TASK = {
+    "verdict": "Idle",
+    "message": "No active task selected. Pick a task to get started! 🎯",
+    "reasoning": "No active task"
+}
+_NO_CONNECTION = {"verdict": "On Track", "reasoning": "No connection"}
+
+# Verdicts produced by _call_llm's fallback paths; these are never cached.
+_FALLBACK_REASONS = {"No client", "No content", "AI response parsing fallback", "Error occurred"}
 
 
 class FocusAgent:
     """AI agent that monitors focus and provides Duolingo-style nudges."""
 
+    VERDICT_CACHE_SIZE = 128
+    # Reuse the last verdict when only the edited content moved this little
+    SIMILARITY_THRESHOLD = 0.95
+    # How long a verdict is served for the same task and set of touched files
+    # while a fresh one is fetched in the background
+    TRANSITION_TTL = 300.0
+    PROBE_TTL = 60.0
+
     def __init__(self, provider: str = "openai", api_key: Optional[str] = None,
-                 base_url: Optional[str] = None, model: Optional[str] = None):
+                 base_url: Optional[str] = None, model: Optional[str] = None,
+                 quick_verdicts: Optional[bool] = None):
         """Initialize the focus agent with AI provider."""
         self.provider = provider.lower()
+        if quick_verdicts is None:
+            quick_verdicts = os.getenv("QUICK_VERDICTS", "true").lower() != "false"
+        self.quick_verdicts = quick_verdicts
         self.last_verdict: Optional[str] = None
-        self.idle_count = 0
-        self.distracted_count = 0
+        self._counts = 0
         self.connection_healthy = False
+        self._verdict_cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self._last_window: Optional[Tuple[Any, ActivityWindow, Dict]] = None
+        self._transitions: "OrderedDict[Tuple, Tuple[Dict, float]]" = OrderedDict()
+        self._refreshes: set = set()
+        self._inflight: Dict[str, "asyncio.Task[Dict]"] = {}
+        self._last_probe_ts = 0.0
+        self._probe_lock: Optional[asyncio.Lock] = None
+        self._available_models: List[str] = []
 
         if self.provider == "openai":
-            from openai import OpenAI
             self.api_key = api_key or os.getenv("OPENAI_API_KEY")
-            self.client = OpenAI(api_key=self.api_key) if self.api_key else None
+            self.client = _make_client("openai", self.api_key) if self.api_key else None
             self.model = model or "gpt-4o"
             self.connection_healthy = bool(self.api_key)
         elif self.provider == "anthropic":
-            from anthropic import Anthropic
             self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
-            self.client = Anthropic(api_key=self.api_key) if self.api_key else None
+            self.client = _make_client("anthropic", self.api_key) if self.api_key else None
             self.model = model or "claude-haiku-4-5-20251001"
             self.connection_healthy = bool(self.api_key)
         elif self.provider == "gemini":
@@ -43,150 +429,215 @@ class FocusAgent:
                 self.client = None
                 self.connection_healthy = False
         elif self.provider == "vllm":
-            from openai import OpenAI
             import httpx
             self.api_key = api_key or os.getenv("VLLM_API_KEY", "EMPTY")
             self.base_url = base_url or os.getenv("VLLM_BASE_URL", "http://localhost:8000/v1")
-            self.model = model or os.getenv("VLLM_MODEL", "ibm-granite/granite-4.0-h-1b")
+            self.model = model or os.getenv("VLLM_MODEL", DEFAULT_VLLM_MODEL)
 
-            try:
-                timeout = httpx.Timeout(5.0, connect=2.0)
-                self.client = OpenAI(api_key=self.api_key, base_url=self.base_url, timeout=timeout)
-                test_response = self.client.models.list()
-                self.connection_healthy = True
-            except Exception as e:
-                print(f"⚠️ vLLM connection failed: {e}")
-                print(f"   Make sure vLLM server is running at {self.base_url}")
-                self.client = None
-                self.connection_healthy = False
+            # Reachability is probed lazily on first use (see _ensure_connection);
+            # connection_healthy stays False until a probe or call succeeds
+            timeout = httpx.Timeout(5.0, connect=2.0)
+            self.client = _make_client("vllm", self.api_key, self.base_url, timeout=timeout)
         else:
             raise ValueError(f"Unsupported provider: {provider}. Supported: openai, anthropic, gemini, vllm")
 
-    def _create_analysis_prompt(self, active_task: Dict, recent_activity: List[Dict]) -> str:
-        """Create the analysis prompt for the LLM."""
-        if not recent_activity:
-            return f"""You are FocusFlow, a Duolingo-style accountability buddy for developers.
-
-**Current Task:**
-- Title: {active_task.get('title', 'No task')}
-- Description: {active_task.get('description', 'No description')}
-
-**Recent Activity:** No file changes detected in the last 60 seconds.
-
-**Your Job:** Analyze the situation and respond with ONE of these verdicts:
-1. "On Track" - If there's activity related to the task
-2. "Distracted" - If files unrelated to the task are being edited
-3. "Idle" - If there's no activity
-
-Respond in JSON format:
-{{
-  "verdict": "On Track" | "Distracted" | "Idle",
-  "message": "Your encouraging/sassy/nudging message (1-2 sentences, Duolingo style)",
-  "reasoning": "Brief explanation of your analysis"
-}}"""
-
-        activity_summary = []
-        for event in recent_activity[-5:]:
-            activity_summary.append(
-                f"- {event['type'].upper()}: {event['filename']}\n  Content: {event.get('content', 'N/A')[:200]}"
-            )
+    @property
+    def idle_count(self) -> int:
+        """Consecutive Idle verdicts (low 16 bits of the packed counters)."""
+        return self._counts & _COUNT_MASK
 
-        activity_text = "\n".join(activity_summary)
+    @idle_count.setter
+    def idle_count(self, value: int):
+        self._counts = (self._counts & ~_COUNT_MASK) | min(value, _COUNT_MASK)
 
-        return f"""You are FocusFlow, a Duolingo-style accountability buddy for developers.
+    @property
+    def distracted_count(self) -> int:
+        """Consecutive Distracted verdicts (high 16 bits of the packed counters)."""
+        return self._counts >> 16
 
-**Current Task:**
-- Title: {active_task.get('title', 'No task')}
-- Description: {active_task.get('description', 'No description')}
+    @distracted_count.setter
+    def distracted_count(self, value: int):
+        self._counts = (self._counts & _COUNT_MASK) | (min(value, _COUNT_MASK) << 16)
 
-**Recent File Activity (last 60 seconds):**
-{activity_text}
+    def _create_analysis_prompt(self, active_task: Dict, activity: ActivityWindow) -> str:
+        """Create the per-call part of the analysis prompt (task + activity)."""
+        fields = {
+            "title": active_task.get('title', 'No task'),
+            "description": active_task.get('description', 'No description'),
+        }
+        if not activity:
+            return _PROMPT_NO_ACTIVITY.format_map(fields)
 
-**Your Job:** Analyze if the file changes are related to the current task.
+        fields["activity"] = _format_activity(activity)
+        return _PROMPT_WITH_ACTIVITY.format_map(fields)
 
-**Personality Guidelines:**
-- "On Track": Be encouraging and specific (e.g., "Great job! I see you're working on the login form!")
-- "Distracted": Be playfully sassy (e.g., "Wait, why are you editing random_file.py? We're building a Snake game! 🤨")
-- "Idle": Be gently nudging (e.g., "Files won't write themselves. *Hoot hoot.* 🦉")
+    def _verdict_cache_key(self, active_task: Dict, activity: ActivityWindow) -> str:
+        """Fingerprint the task and the activity window the prompt is built from."""
+        # Without activity the inputs never change, so bucket by minute to let
+        # an Idle verdict be re-evaluated periodically.
+        bucket = None if activity else int(time.time() // 60)
+        payload = repr((active_task.get('id'), active_task.get('title'), active_task.get('description'),
+                        activity, bucket))
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
 
-Respond in JSON format:
-{{
-  "verdict": "On Track" | "Distracted" | "Idle",
-  "message": "Your message (1-2 sentences)",
-  "reasoning": "Brief explanation"
-}}"""
+    def check_connection(self) -> bool:
+        """Probe the vLLM server if it's due; returns whether the provider is reachable."""
+        _run_sync(self._ensure_connection())
+        return self.connection_healthy
 
-    def _call_llm(self, prompt: str) -> Dict:
-        """Call the LLM and parse the response."""
-        try:
-            if self.provider in ["openai", "vllm"]:
-                if not self.client:
-                    return {"verdict": "On Track", "message": "API client not initialized", "reasoning": "No client"}
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.7,
-                    max_tokens=300
-                )
-                content = response.choices[0].message.content
-            elif self.provider == "gemini":
-                if not self.client:
-                    return {"verdict": "On Track", "message": "API client not initialized", "reasoning": "No client"}
-                response = self.client.generate_content(
-                    prompt,
-                    generation_config={
-                        "temperature": 0.7,
-                        "max_output_tokens": 300,
-                    }
-                )
-                content = response.text
-            else:  # anthropic
-                if not self.client:
-                    return {"verdict": "On Track", "message": "API client not initialized", "reasoning": "No client"}
-                response = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=300,
-                    temperature=0.7,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                content = response.content[0].text
+    async def _ensure_connection(self):
+        """Probe the vLLM server at most once per PROBE_TTL seconds."""
+        if self.provider != "vllm" or not self.client:
+            return
+        if time.monotonic() - self._last_probe_ts < self.PROBE_TTL:
+            return
 
-            if not content:
-                return {"verdict": "On Track", "message": "Empty response from API", "reasoning": "No content"}
+        if self._probe_lock is None:
+            self._probe_lock = asyncio.Lock()
+        async with self._probe_lock:
+            # Another caller may have probed while we waited
+            if time.monotonic() - self._last_probe_ts < self.PROBE_TTL:
+                return
+            try:
+                models = await _call_with_retry(self.client.models.list)
+                self._available_models = [m.id for m in models.data]
+                self.connection_healthy = True
+            except Exception as e:
+                print(f"⚠️ vLLM connection failed: {e}")
+                print(f"   Make sure vLLM server is running at {self.base_url}")
+                self.connection_healthy = False
+            self._last_probe_ts = time.monotonic()
+
+    async def _stream_chat(self, prompt: str, system: str, max_tokens: int,
+                           schema_name: str, schema: Dict) -> AsyncIterator[str]:
+        """Stream the raw JSON completion text from the configured provider."""
+        if self.provider in ["openai", "vllm"]:
+            if self.provider == "vllm":
+                # vLLM's guided decoding constrains tokens to the schema directly
+                structured = {"extra_body": {"guided_json": schema}}
+            else:
+                structured = {"response_format": {
+                    "type": "json_schema",
+                    "json_schema": {"name": schema_name, "schema": schema, "strict": True}
+                }}
+            stream = await self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.7,
+                max_tokens=max_tokens,
+                stream=True,
+                **structured
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        elif self.provider == "gemini":
+            # Gemini takes its system instruction per model, so keep the
+            # static text as the leading prefix of the request instead.
+            response = await self.client.generate_content_async(
+                f"{system}\n\n{prompt}",
+                generation_config={
+                    "temperature": 0.7,
+                    "max_output_tokens": max_tokens,
+                    "response_mime_type": "application/json",
+                },
+                stream=True
+            )
+            async for chunk in response:
+                if chunk.text:
+                    yield chunk.text
+        else:  # anthropic
+            async with self.client.messages.stream(
+                model=self.model,
+                max_tokens=max_tokens,
+                temperature=0.7,
+                system=[{
+                    "type": "text",
+                    "text": system,
+                    "cache_control": {"type": "ephemeral"}
+                }],
+                messages=[{"role": "user", "content": prompt}],
+                # Forcing a single tool call makes Claude emit its answer as
+                # schema-conforming JSON tool input.
+                tools=[{"name": schema_name, "description": "Report the result.", "input_schema": schema}],
+                tool_choice={"type": "tool", "name": schema_name}
+            ) as stream:
+                async for event in stream:
+                    if event.type != "content_block_delta":
+                        continue
+                    if event.delta.type == "input_json_delta":
+                        yield event.delta.partial_json
+                    elif event.delta.type == "text_delta":
+                        yield event.delta.text
 
-            # Try to parse JSON from the response
-            content = content.strip()
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0].strip()
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0].strip()
+    def _parse_verdict(self, content: str) -> Dict:
+        """Parse the verdict JSON out of a completed response."""
+        if not content:
+            return {"verdict": "On Track", "message": "Empty response from API", "reasoning": "No content"}
 
-            result = json.loads(content)
-            return result
+        try:
+            # Structured output is already bare JSON; fences only show up
+            # from servers that ignore the requested schema.
+            return _parse_json(content)
 
         except json.JSONDecodeError:
             # Fallback if JSON parsing fails
             return {
                 "verdict": "On Track",
-                "message": content[:200],
+                "message": _extract_json(content)[:200],
                 "reasoning": "AI response parsing fallback"
             }
+
+    def _error_verdict(self, error: Exception) -> Dict:
+        """Fallback verdict when the provider call fails."""
+        return {
+            "verdict": "On Track",
+            "message": f"Error analyzing activity: {str(error)}",
+            "reasoning": "Error occurred"
+        }
+
+    @_with_retry
+    async def _chat(self, prompt: str, system: str, max_tokens: int,
+                    schema_name: str, schema: Dict) -> str:
+        """Run one completion to the end and return its raw text."""
+        chunks: List[str] = []
+        async for delta in self._stream_chat(prompt, system, max_tokens, schema_name, schema):
+            chunks.append(delta)
+
+        # A completed call is as good as a probe
+        if self.provider == "vllm":
+            self.connection_healthy = True
+            self._last_probe_ts = time.monotonic()
+        return "".join(chunks)
+
+    async def _call_llm(self, prompt: str, system: str = ANALYSIS_SYSTEM_PROMPT) -> Dict:
+        """Call the LLM and parse the response."""
+        if not self.client:
+            return {"verdict": "On Track", "message": "API client not initialized", "reasoning": "No client"}
+
+        try:
+            content = await self._chat(prompt, system, ANALYSIS_MAX_TOKENS, "report_verdict", VERDICT_SCHEMA)
         except Exception as e:
-            return {
-                "verdict": "On Track",
-                "message": f"Error analyzing activity: {str(e)}",
-                "reasoning": "Error occurred"
-            }
+            return self._error_verdict(e)
+
+        return self._parse_verdict(content)
 
     def analyze(self, active_task: Optional[Dict], recent_activity: List[Dict]) -> Dict:
         """Analyze current activity and return verdict."""
+        return _run_sync(self.analyze_async(active_task, recent_activity))
+
+    @_on_agent_loop
+    async def analyze_many(self, items: List[Tuple[Optional[Dict], List[Dict]]]) -> List[Dict]:
+        """Analyze a batch of (active_task, recent_activity) pairs concurrently."""
+        return list(await asyncio.gather(*(self.analyze_async(task, activity) for task, activity in items)))
+
+    def _precheck(self, active_task: Optional[Dict]) -> Optional[Dict]:
+        """Return a canned verdict when there is nothing to send to the LLM."""
         if not active_task:
-            return {
-                "verdict": "Idle",
-                "message": "No active task selected. Pick a task to get started! 🎯",
-                "reasoning": "No active task",
-                "timestamp": datetime.now().isoformat()
-            }
+            return {**_IDLE_NO_TASK, "timestamp": datetime.now().isoformat()}
 
         if not self.connection_healthy or not self.client:
             provider_name = self.provider.upper()
@@ -194,105 +645,360 @@ Respond in JSON format:
                 msg = f"⚠️ vLLM server not reachable. Make sure it's running at {self.base_url}"
             else:
                 msg = f"⚠️ {provider_name} API key not configured. Add your API key to enable AI monitoring."
-            return {
-                "verdict": "On Track",
-                "message": msg,
-                "reasoning": "No connection",
-                "timestamp": datetime.now().isoformat()
-            }
+            return {**_NO_CONNECTION, "message": msg, "timestamp": datetime.now().isoformat()}
+
+        return None
 
-        prompt = self._create_analysis_prompt(active_task, recent_activity)
-        result = self._call_llm(prompt)
+    def clear_verdict_cache(self):
+        """Forget cached verdicts, e.g. after the active task or monitoring changes."""
+        self._verdict_cache.clear()
+        self._last_window = None
+        self._transitions.clear()
+
+    def _remember_verdict(self, cache_key: str, result: Dict,
+                          active_task: Optional[Dict] = None, activity: ActivityWindow = ()):
+        """Store a successful LLM verdict in the LRU cache."""
+        if result.get("reasoning") in _FALLBACK_REASONS:
+            return
+        self._verdict_cache[cache_key] = dict(result)
+        if len(self._verdict_cache) > self.VERDICT_CACHE_SIZE:
+            self._verdict_cache.popitem(last=False)
+        if active_task is not None and activity:
+            self._last_window = (active_task.get('id'), activity, dict(result))
+            key = _transition_key(active_task, activity)
+            self._transitions[key] = (dict(result), time.monotonic() + self.TRANSITION_TTL)
+            self._transitions.move_to_end(key)
+            if len(self._transitions) > self.VERDICT_CACHE_SIZE:
+                self._transitions.popitem(last=False)
+
+    def _cached_verdict(self, cache_key: str, active_task: Optional[Dict] = None,
+                        activity: ActivityWindow = ()) -> Optional[Dict]:
+        """
+        Look up a cached verdict, refreshing its LRU position. Falls back to
+        the last LLM verdict when the same files were touched for the same
+        task and their content is at least SIMILARITY_THRESHOLD similar.
+        """
+        cached = self._verdict_cache.get(cache_key)
+        if cached is not None:
+            self._verdict_cache.move_to_end(cache_key)
+        elif active_task is not None and self._is_near_duplicate(active_task, activity):
+            cached = self._last_window[2]
+        else:
+            return None
+        return dict(cached)
+
+    def _stale_verdict(self, cache_key: str, active_task: Dict, activity: ActivityWindow) -> Optional[Dict]:
+        """
+        Serve the verdict last given for the same task and touched files
+        (within TRANSITION_TTL) and refresh it with the LLM in the background.
+        """
+        if not activity:
+            return None
+        entry = self._transitions.get(_transition_key(active_task, activity))
+        if entry is None or entry[1] < time.monotonic():
+            return None
+
+        refresh = asyncio.ensure_future(self._coalesced_call(cache_key, active_task, activity))
+        # Hold a reference until it finishes so the task isn't garbage collected
+        self._refreshes.add(refresh)
+        refresh.add_done_callback(self._refreshes.discard)
+        return dict(entry[0])
+
+    def _is_near_duplicate(self, active_task: Dict, activity: ActivityWindow) -> bool:
+        """Whether activity only differs from the last LLM-checked window by small edits."""
+        if self._last_window is None or not activity:
+            return False
+        task_id, last_activity, _ = self._last_window
+        if task_id != active_task.get('id') or len(last_activity) != len(activity):
+            return False
+        if any(old[:2] != new[:2] for old, new in zip(last_activity, activity)):
+            return False
+        matcher = SequenceMatcher(None, "\n".join(e[2] for e in last_activity),
+                                  "\n".join(e[2] for e in activity), autojunk=False)
+        return (matcher.real_quick_ratio() >= self.SIMILARITY_THRESHOLD
+                and matcher.quick_ratio() >= self.SIMILARITY_THRESHOLD
+                and matcher.ratio() >= self.SIMILARITY_THRESHOLD)
+
+    def _finalize_verdict(self, result: Dict) -> Dict:
+        """Stamp the result and update the consecutive idle/distracted streaks."""
         result["timestamp"] = datetime.now().isoformat()
 
-        # Track consecutive idle/distracted states
+        # Track consecutive idle/distracted states; each resets the other
         verdict = result.get("verdict", "On Track")
         if verdict == "Idle":
-            self.idle_count += 1
-            self.distracted_count = 0
+            self._counts = min((self._counts & _COUNT_MASK) + 1, _COUNT_MASK)
         elif verdict == "Distracted":
-            self.distracted_count += 1
-            self.idle_count = 0
+            self._counts = min((self._counts >> 16) + 1, _COUNT_MASK) << 16
         else:
-            self.idle_count = 0
-            self.distracted_count = 0
+            self._counts = 0
 
-        result["should_alert"] = (self.idle_count >= 2 or self.distracted_count >= 2)
+        result["should_alert"] = (self._counts & _COUNT_MASK) >= 2 or (self._counts >> 16) >= 2
         self.last_verdict = verdict
 
         return result
 
+    @_on_agent_loop
+    async def analyze_async(self, active_task: Optional[Dict], recent_activity: List[Dict]) -> Dict:
+        """Analyze current activity and return verdict (async)."""
+        await self._ensure_connection()
+        early = self._precheck(active_task)
+        if early:
+            return early
+
+        activity = _compact_activity(recent_activity)
+        quick = self.quick_verdicts and _quick_verdict(active_task, activity)
+        if quick:
+            return self._finalize_verdict(quick)
+
+        cache_key = self._verdict_cache_key(active_task, activity)
+        result = (self._cached_verdict(cache_key, active_task, activity)
+                  or self._stale_verdict(cache_key, active_task, activity))
+        if result is None:
+            result = dict(await self._coalesced_call(cache_key, active_task, activity))
+
+        return self._finalize_verdict(result)
+
+    async def _coalesced_call(self, cache_key: str, active_task: Dict, activity: ActivityWindow) -> Dict:
+        """Run the LLM call for a cache miss, sharing it with identical concurrent requests."""
+        task = self._inflight.get(cache_key)
+        if task is None:
+            async def call() -> Dict:
+                try:
+                    result = await self._call_llm(self._create_analysis_prompt(active_task, activity))
+                    self._remember_verdict(cache_key, result, active_task, activity)
+                    return result
+                finally:
+                    self._inflight.pop(cache_key, None)
+
+            task = asyncio.ensure_future(call())
+            self._inflight[cache_key] = task
+        # Shield so one cancelled caller doesn't cancel the call for the others
+        return await asyncio.shield(task)
+
+    async def _open_stream(self, prompt: str) -> Tuple[AsyncIterator[str], str]:
+        """Start an analysis stream; returns it with its first delta."""
+        stream = self._stream_chat(prompt, ANALYSIS_SYSTEM_PROMPT, ANALYSIS_MAX_TOKENS,
+                                   "report_verdict", VERDICT_SCHEMA)
+        # Provider errors surface before the first delta, so a retry covers this part only
+        return stream, await anext(stream, "")
+
+    @_streamed_on_agent_loop
+    async def analyze_stream(self, active_task: Optional[Dict],
+                             recent_activity: List[Dict]) -> AsyncIterator[Dict]:
+        """
+        Analyze activity while streaming the response.
+
+        Yields {"partial": True, "message": ...} as the message field grows,
+        followed by the final verdict dict (same shape as analyze()).
+        """
+        await self._ensure_connection()
+        early = self._precheck(active_task)
+        if early:
+            yield early
+            return
+
+        activity = _compact_activity(recent_activity)
+        quick = self.quick_verdicts and _quick_verdict(active_task, activity)
+        if quick:
+            yield self._finalize_verdict(quick)
+            return
+
+        cache_key = self._verdict_cache_key(active_task, activity)
+        result = (self._cached_verdict(cache_key, active_task, activity)
+                  or self._stale_verdict(cache_key, active_task, activity))
+        if result is None:
+            prompt = self._create_analysis_prompt(active_task, activity)
+            try:
+                stream, delta = await _call_with_retry(self._open_stream, prompt)
+                buffer = ""
+                # Offset where the message text starts (once its key has arrived), where
+                # scanning resumes, and whether the closing quote has been seen
+                start = None
+                scan = 0
+                complete = False
+                while delta is not None:
+                    buffer += delta
+                    if start is None:
+                        match = _MESSAGE_KEY_RE.search(buffer, scan)
+                        if match:
+                            start = scan = match.end()
+                        else:
+                            # A later match starts at an already complete "message" or in the last few characters
+                            found = buffer.rfind('"message"', scan)
+                            scan = found if found >= 0 else max(scan, len(buffer) - len('"message"') + 1)
+                    if start is not None and not complete:
+                        end = _MESSAGE_BODY_RE.match(buffer, scan).end()
+                        if end > scan:
+                            try:
+                                yield {"partial": True, "message": _json_loads(f'"{buffer[start:end]}"')}
+                            except json.JSONDecodeError:
+                                # Never show escaped JSON; the next delta retries from the message start
+                                pass
+                        scan = end
+                        complete = buffer[end:end + 1] == '"'
+                    delta = await anext(stream, None)
+                result = self._parse_verdict(buffer)
+            except Exception as e:
+                result = self._error_verdict(e)
+            self._remember_verdict(cache_key, result, active_task, activity)
+
+        yield self._finalize_verdict(result)
+
     def get_onboarding_tasks(self, project_description: str) -> List[Dict]:
         """Generate micro-tasks from project description."""
+        return _run_sync(self.get_onboarding_tasks_async(project_description))
+
+    @_on_agent_loop
+    async def get_onboarding_tasks_async(self, project_description: str) -> List[Dict]:
+        """Generate micro-tasks from project description (async)."""
+        await self._ensure_connection()
         if not self.connection_healthy or not self.client:
             return []
 
-        prompt = f"""You are FocusFlow, an AI project planner.
+        try:
+            content = await self._chat(_planning_prompt(project_description), ONBOARDING_SYSTEM_PROMPT,
+                                       ONBOARDING_MAX_TOKENS, "report_tasks", ONBOARDING_SCHEMA)
+            if not content:
+                return []
+            return _parse_json(content).get("tasks", [])
+
+        except Exception as e:
+            print(f"Error generating tasks: {e}")
+            return []
 
-The user wants to build: "{project_description}"
+    def plan_many(self, project_descriptions: List[str], poll_interval: float = 30.0) -> List[List[Dict]]:
+        """
+        Generate task lists for several projects through the provider's batch API.
 
-Break this down into 5-8 concrete, actionable micro-tasks. Each task should be:
-- Specific and achievable in 15-30 minutes
-- Ordered logically (setup → core features → polish)
-- Clearly described
+        Batches are billed at half price but can take minutes (or hours) to
+        finish, so this is for bulk/offline planning only; interactive
+        onboarding keeps using get_onboarding_tasks().
+        """
+        return _run_sync(self.plan_many_async(project_descriptions, poll_interval))
 
-Respond in JSON format:
-{{
-  "tasks": [
-    {{"title": "Task 1 title", "description": "Detailed description", "estimated_duration": "15 min"}},
-    {{"title": "Task 2 title", "description": "Detailed description", "estimated_duration": "20 min"}}
-  ]
-}}"""
+    @_on_agent_loop
+    async def plan_many_async(self, project_descriptions: List[str],
+                              poll_interval: float = 30.0) -> List[List[Dict]]:
+        """Batch counterpart of get_onboarding_tasks_async(), one task list per project."""
+        if not project_descriptions:
+            return []
+        await self._ensure_connection()
+        if not self.connection_healthy or not self.client:
+            return [[] for _ in project_descriptions]
 
+        prompts = [_planning_prompt(d) for d in project_descriptions]
         try:
-            if self.provider in ["openai", "vllm"]:
-                if not self.client:
-                    return []
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.7,
-                    max_tokens=800
-                )
-                content = response.choices[0].message.content
-            elif self.provider == "gemini":
-                if not self.client:
-                    return []
-                response = self.client.generate_content(
-                    prompt,
-                    generation_config={
-                        "temperature": 0.7,
-                        "max_output_tokens": 800,
+            if self.provider == "openai":
+                contents = await self._openai_batch(prompts, poll_interval)
+            elif self.provider == "anthropic":
+                contents = await self._anthropic_batch(prompts, poll_interval)
+            else:
+                # Gemini and vLLM have no batch endpoint; fan out concurrently instead
+                return list(await asyncio.gather(
+                    *(self.get_onboarding_tasks_async(d) for d in project_descriptions)
+                ))
+        except Exception as e:
+            print(f"Error running planning batch: {e}")
+            return [[] for _ in project_descriptions]
+
+        plans = []
+        for content in contents:
+            try:
+                plans.append(_parse_json(content).get("tasks", []) if content else [])
+            except json.JSONDecodeError:
+                plans.append([])
+        return plans
+
+    async def _openai_batch(self, prompts: List[str], poll_interval: float) -> List[Optional[str]]:
+        """Run onboarding prompts through the OpenAI Batch API; returns raw contents in order."""
+        lines = []
+        for i, prompt in enumerate(prompts):
+            lines.append(json.dumps({
+                "custom_id": f"plan-{i}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.model,
+                    "messages": [
+                        {"role": "system", "content": ONBOARDING_SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt}
+                    ],
+                    "temperature": 0.7,
+                    "max_tokens": ONBOARDING_MAX_TOKENS,
+                    "response_format": {
+                        "type": "json_schema",
+                        "json_schema": {"name": "report_tasks", "schema": ONBOARDING_SCHEMA, "strict": True}
                     }
-                )
-                content = response.text
-            else:  # anthropic
-                if not self.client:
-                    return []
-                response = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=800,
-                    temperature=0.7,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                content = response.content[0].text
+                }
+            }))
 
-            if not content:
-                return []
+        batch_file = await _call_with_retry(
+            self.client.files.create,
+            file=("focusflow_plans.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = await _call_with_retry(
+            self.client.batches.create,
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            await asyncio.sleep(poll_interval)
+            batch = await _call_with_retry(self.client.batches.retrieve, batch.id)
 
-            # Parse JSON
-            content = content.strip()
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0].strip()
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0].strip()
+        contents: List[Optional[str]] = [None] * len(prompts)
+        if not batch.output_file_id:
+            return contents
 
-            result = json.loads(content)
-            return result.get("tasks", [])
+        output = await _call_with_retry(self.client.files.content, batch.output_file_id)
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            entry = _json_loads(line)
+            response = entry.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+            index = int(entry["custom_id"].split("-", 1)[1])
+            contents[index] = response["body"]["choices"][0]["message"]["content"]
+        return contents
 
-        except Exception as e:
-            print(f"Error generating tasks: {e}")
-            return []
+    async def _anthropic_batch(self, prompts: List[str], poll_interval: float) -> List[Optional[str]]:
+        """Run onboarding prompts through Anthropic Message Batches; returns raw contents in order."""
+        batch = await _call_with_retry(self.client.messages.batches.create, requests=[
+            {
+                "custom_id": f"plan-{i}",
+                "params": {
+                    "model": self.model,
+                    "max_tokens": ONBOARDING_MAX_TOKENS,
+                    "temperature": 0.7,
+                    "system": [{
+                        "type": "text",
+                        "text": ONBOARDING_SYSTEM_PROMPT,
+                        "cache_control": {"type": "ephemeral"}
+                    }],
+                    "messages": [{"role": "user", "content": prompt}],
+                    "tools": [{"name": "report_tasks", "description": "Report the result.",
+                               "input_schema": ONBOARDING_SCHEMA}],
+                    "tool_choice": {"type": "tool", "name": "report_tasks"}
+                }
+            }
+            for i, prompt in enumerate(prompts)
+        ])
+        while batch.processing_status != "ended":
+            await asyncio.sleep(poll_interval)
+            batch = await _call_with_retry(self.client.messages.batches.retrieve, batch.id)
+
+        contents: List[Optional[str]] = [None] * len(prompts)
+        async for entry in await _call_with_retry(self.client.messages.batches.results, batch.id):
+            if entry.result.type != "succeeded":
+                continue
+            index = int(entry.custom_id.split("-", 1)[1])
+            for block in entry.result.message.content:
+                if block.type == "tool_use":
+                    contents[index] = json.dumps(block.input)
+                    break
+        return contents
 
 
 class MockFocusAgent(FocusAgent):
@@ -302,12 +1008,14 @@ class MockFocusAgent(FocusAgent):
         """Initialize mock agent without any API dependencies."""
         self.provider = "mock"
         self.last_verdict = None
-        self.idle_count = 0
-        self.distracted_count = 0
+        self._counts = 0
         self.connection_healthy = True
         self.client = None
         self.api_key = None
         self.check_counter = 0
+        self._verdict_cache = OrderedDict()
+        self._last_window = None
+        self._transitions = OrderedDict()
 
         self.verdicts_cycle = ["On Track", "On Track", "Distracted", "On Track", "Idle"]
         self.messages = {
@@ -334,41 +1042,39 @@ class MockFocusAgent(FocusAgent):
     def analyze(self, active_task: Optional[Dict], recent_activity: List[Dict]) -> Dict:
         """Return mock analysis results."""
         if not active_task:
-            return {
-                "verdict": "Idle",
-                "message": "No active task selected. Pick a task to get started! 🎯",
-                "reasoning": "No active task (mock mode)",
-                "timestamp": datetime.now().isoformat()
-            }
+            return {**_IDLE_NO_TASK, "reasoning": "No active task (mock mode)",
+                    "timestamp": datetime.now().isoformat()}
 
         # Cycle through verdicts
         verdict = self.verdicts_cycle[self.check_counter % len(self.verdicts_cycle)]
         self.check_counter += 1
 
         # Get message for this verdict
-        import random
         message = random.choice(self.messages[verdict])
 
-        # Track consecutive states
-        if verdict == "Idle":
-            self.idle_count += 1
-            self.distracted_count = 0
-        elif verdict == "Distracted":
-            self.distracted_count += 1
-            self.idle_count = 0
-        else:
-            self.idle_count = 0
-            self.distracted_count = 0
-
-        self.last_verdict = verdict
-
-        return {
+        return self._finalize_verdict({
             "verdict": verdict,
             "message": message,
-            "reasoning": f"Mock analysis for task: {active_task.get('title', 'Unknown')}",
-            "timestamp": datetime.now().isoformat(),
-            "should_alert": (self.idle_count >= 2 or self.distracted_count >= 2)
-        }
+            "reasoning": f"Mock analysis for task: {active_task.get('title', 'Unknown')}"
+        })
+
+    async def analyze_async(self, active_task: Optional[Dict], recent_activity: List[Dict]) -> Dict:
+        """Return mock analysis results (async)."""
+        return self.analyze(active_task, recent_activity)
+
+    async def analyze_stream(self, active_task: Optional[Dict],
+                             recent_activity: List[Dict]) -> AsyncIterator[Dict]:
+        """Yield the mock analysis as a single final result."""
+        yield self.analyze(active_task, recent_activity)
+
+    async def get_onboarding_tasks_async(self, project_description: str) -> List[Dict]:
+        """Generate mock tasks (async)."""
+        return self.get_onboarding_tasks(project_description)
+
+    async def plan_many_async(self, project_descriptions: List[str],
+                              poll_interval: float = 30.0) -> List[List[Dict]]:
+        """Generate mock task lists for several projects."""
+        return [self.get_onboarding_tasks(d) for d in project_descriptions]
 
     def get_onboarding_tasks(self, project_description: str) -> List[Dict]:
         """Generate mock tasks based on project description."""
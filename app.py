@@ -4,36 +4,69 @@ Configurable via environment variables for HuggingFace Spaces or local use.
 """
 import gradio as gr
 import os
-from dotenv import load_dotenv
-from shared import task_manager, metrics_tracker
-from monitor import FileMonitor
-from voice import voice_generator
-from linear_client import LinearClient
+import threading
+from shared import task_manager, metrics_tracker, LAUNCH_MODE
 from core.pomodoro import PomodoroTimer
 from core.focus_check import FocusMonitor
 from ui.handlers import UIHandlers
 from ui.layout import create_app
 
-# Load environment variables
-load_dotenv()
+# Environment variables (.env) are loaded by shared.py on import
+MCP_ENABLED = os.getenv("ENABLE_MCP", "true").lower() == "true"
 
-# Import MCP tools to register them with Gradio
-try:
-    import mcp_tools
-    MCP_AVAILABLE = True
-except Exception as e:
-    print(f"⚠️ MCP tools not available: {e}")
-    MCP_AVAILABLE = False
+# Import MCP tools to register them with Gradio (skipped entirely when disabled)
+MCP_AVAILABLE = False
+if MCP_ENABLED:
+    try:
+        import mcp_tools
+        MCP_AVAILABLE = True
+    except Exception as e:
+        print(f"⚠️ MCP tools not available: {e}")
+
+
+class LazyProxy:
+    """Stand-in that builds its target on first attribute access."""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._target = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if self._target is None:
+            # Handlers run on worker threads; build the target only once
+            with self._lock:
+                if self._target is None:
+                    self._target = self._factory()
+        return getattr(self._target, name)
+
+
+def _load_file_monitor():
+    from monitor import FileMonitor
+    return FileMonitor()
+
+
+def _load_voice_generator():
+    from voice import voice_generator
+    return voice_generator
+
+
+def _load_linear_client():
+    from linear_client import LinearClient
+    return LinearClient()
 
 # Configuration from environment
-LAUNCH_MODE = os.getenv("LAUNCH_MODE", "demo").lower()  # 'demo' or 'local'
+# LAUNCH_MODE ('demo' or 'local') comes from shared.py so storage and UI agree
 AI_PROVIDER = os.getenv("AI_PROVIDER", "openai").lower()  # 'openai', 'anthropic', or 'vllm'
 MONITOR_INTERVAL = int(os.getenv("MONITOR_INTERVAL", "30"))  # seconds
 
 # Initialize Core Components
 # task_manager and metrics_tracker are imported from shared.py
-file_monitor = FileMonitor()
-linear_client = LinearClient()
+# The file watcher (watchdog), voice (ElevenLabs SDK) and Linear (requests) load
+# on first use, not at startup; demo mode never touches the watcher
+file_monitor = LazyProxy(_load_file_monitor)
+voice_generator = LazyProxy(_load_voice_generator)
+linear_client = LazyProxy(_load_linear_client)
 
 # Initialize Logic Modules
 focus_monitor = FocusMonitor(task_manager, file_monitor, metrics_tracker, voice_generator)
@@ -45,13 +78,12 @@ pomodoro_timer = PomodoroTimer()
 ui_handlers = UIHandlers(task_manager, file_monitor, metrics_tracker, focus_monitor, linear_client)
 
 # Create App
-app = create_app(ui_handlers, pomodoro_timer, LAUNCH_MODE, AI_PROVIDER, MONITOR_INTERVAL)
+app = create_app(ui_handlers, pomodoro_timer, LAUNCH_MODE, AI_PROVIDER, MONITOR_INTERVAL,
+                 enable_mcp=MCP_AVAILABLE)
 
 if __name__ == "__main__":
     # Enable MCP server if available
-    mcp_enabled = os.getenv("ENABLE_MCP", "true").lower() == "true"
-
-    if MCP_AVAILABLE and mcp_enabled:
+    if MCP_AVAILABLE:
         print("🔗 MCP Server enabled! Connect via Claude Desktop or other MCP clients.")
         app.launch(server_name="0.0.0.0", server_port=5000, share=False, mcp_server=True)
     else:
@@ -3,7 +3,45 @@ Focus Monitoring Logic.
 """
 import time
 import json
-from typing import List, Optional, Tuple, Any
+import asyncio
+import threading
+from collections import deque
+from functools import lru_cache
+from typing import Deque, Dict, Iterable, List, Optional, Tuple, Any
+
+# Number of focus-check verdicts kept in the on-screen log
+ACTIVITY_LOG_SIZE = 20
+# Characters from the end of the demo text sent as activity
+DEMO_TAIL_CHARS = 500
+# A check finishing this recently on unchanged tasks and activity is reused
+# instead of re-run (e.g. several sessions' timers firing back to back)
+CHECK_REUSE_SECONDS = 5.0
+
+_NO_TASK_LOG_ENTRY = "💤 [Idle] No active task selected. Pick a task to get started! 🎯"
+
+# Browser-side alert for Distracted/Idle verdicts; fill with .format(message=<JSON string>)
+_ALERT_JS_TEMPLATE = """
+() => {{
+    const audio = document.getElementById('nudge-alert');
+    if (audio) {{
+        audio.currentTime = 0;
+        audio.play().catch(e => console.log('Audio play failed:', e));
+    }}
+    if (Notification.permission === "granted") {{
+        new Notification("FocusFlow Alert 🦉", {{
+            body: {message},
+            icon: "https://em-content.zobj.net/thumbs/160/apple/354/owl_1f989.png"
+        }});
+    }}
+    return null;
+}}
+"""
+
+@lru_cache(maxsize=64)
+def _alert_js(message: str) -> str:
+    """Render the alert script for a message; nudge messages repeat often."""
+    return _ALERT_JS_TEMPLATE.format(message=json.dumps(message))
+
 
 class FocusMonitor:
     def __init__(self, task_manager, file_monitor, metrics_tracker, voice_generator=None):
@@ -13,10 +51,52 @@ class FocusMonitor:
         self.voice_generator = voice_generator
 
         self.focus_agent = None
+        # Guards the log and verdict streak, which worker-thread checks update
+        self._lock = threading.Lock()
         self.consecutive_distracted = 0
-        self.activity_log: List[str] = []
-        self.demo_text_content = ""
+        self.last_verdict: Optional[str] = None
+        self._activity_log: Deque[str] = deque(maxlen=ACTIVITY_LOG_SIZE)
+        # "\n".join(activity_log), kept in step by _append_log()
+        self._activity_log_text = ""
+        # Demo mode only ever reads the tail of the text, so that's all we keep
+        self.demo_text_len = 0
+        self._demo_activity: List[Dict] = []
         self.launch_mode = "demo" # Default
+        self._inflight_check: Optional[asyncio.Future] = None
+        # (finished at, input key, result) of the last async check
+        self._last_check: Optional[Tuple[float, tuple, Tuple]] = None
+
+    @property
+    def activity_log(self) -> Deque[str]:
+        """Most recent log entries; the oldest drop off automatically."""
+        return self._activity_log
+
+    @activity_log.setter
+    def activity_log(self, entries: Iterable[str]):
+        log = deque(entries, maxlen=ACTIVITY_LOG_SIZE)
+        text = "\n".join(log)
+        with self._lock:
+            self._activity_log, self._activity_log_text = log, text
+
+    @property
+    def activity_log_text(self) -> str:
+        """The focus log as shown in the UI (entries joined by newlines)."""
+        return self._activity_log_text
+
+    def _append_log(self, entry: str) -> str:
+        """Add a log entry and return the updated log text without rejoining every entry."""
+        # The deque and its text must change together
+        with self._lock:
+            log = self._activity_log
+            if len(log) == log.maxlen:
+                # Drop the evicted first line from the front of the text
+                evicted = len(log[0]) + 1
+                log.append(entry)
+                self._activity_log_text = f"{self._activity_log_text[evicted:]}\n{entry}"
+            else:
+                log.append(entry)
+                self._activity_log_text = f"{self._activity_log_text}\n{entry}" if len(log) > 1 else entry
+            return self._activity_log_text
 
     def set_agent(self, agent):
         self.focus_agent = agent
@@ -26,30 +106,81 @@ class FocusMonitor:
 
     def update_demo_text(self, text: str) -> str:
         """Update demo text content (demo mode only)."""
-        self.demo_text_content = text
+        self.demo_text_len = len(text)
+        # Synthetic activity for the focus check, built once per save
+        content = text[-DEMO_TAIL_CHARS:]
+        self._demo_activity = [{
+            'type': 'text_edit',
+            'filename': 'demo_workspace',
+            'content': content,
+            'summary': content[:200],
+            'timestamp': time.time()
+        }] if content else []
         return f"✅ Text updated ({len(text)} characters)"
 
-    def get_activity_summary(self, monitoring_active: bool) -> str:
-        """Get recent activity summary."""
+    def get_activity_summary(self, monitoring_active: bool, events: Optional[List[Dict]] = None) -> str:
+        """Get recent activity summary, optionally from an already-fetched event snapshot."""
         if self.launch_mode == "demo":
-            return f"📝 Demo text content: {len(self.demo_text_content)} characters"
+            return f"📝 Demo text content: {self.demo_text_len} characters"
 
         if not monitoring_active:
             return "⏸️ Monitoring is not active"
 
-        recent = self.file_monitor.get_recent_activity(5)
+        recent = events[-5:] if events is not None else self.file_monitor.get_recent_activity(5)
         if not recent:
             return "💤 No recent file activity"
 
-        summary = []
-        for event in recent:
-            summary.append(f"• {event['type'].upper()}: {event['filename']}")
+        return "\n".join(
+            event.get('formatted') or f"• {event['type'].upper()}: {event['filename']}"
+            for event in recent
+        )
 
-        return "\n".join(summary)
+    async def run_check_async(self, events: Optional[List[Dict]] = None) -> Tuple[str, Optional[str], Optional[Any]]:
+        """
+        Async variant of run_check() for Gradio event handlers.
 
-    def run_check(self) -> Tuple[str, Optional[str], Optional[Any]]:
+        The LLM round-trip (and voice synthesis) runs in a worker thread so
+        the event loop keeps serving other UI events while a check is pending.
+        Callers arriving while a check is in flight share its result instead
+        of starting another one.
+        """
+        check = self._inflight_check
+        if check is None or check.done() or check.get_loop() is not asyncio.get_running_loop():
+            key = self._check_key(events)
+            last = self._last_check
+            if key and last and last[1] == key and time.monotonic() - last[0] < CHECK_REUSE_SECONDS:
+                # Same log, but the earlier check already played its alert and voice clip
+                return last[2][0], None, None
+            check = self._inflight_check = asyncio.ensure_future(self._timed_check(events, key))
+        # Shield so a caller that goes away doesn't cancel the shared check
+        return await asyncio.shield(check)
+
+    async def _timed_check(self, events: Optional[List[Dict]], key: Optional[tuple]) -> Tuple:
+        result = await asyncio.to_thread(self.run_check, events)
+        self._last_check = (time.monotonic(), key, result)
+        return result
+
+    def _check_key(self, events: Optional[List[Dict]]) -> Optional[tuple]:
+        """What a check depends on: task writes and the newest activity event (its file and time)."""
+        if self.launch_mode == "demo":
+            activity = self._demo_activity
+        elif events is None:
+            # run_check() reads the watcher itself; nothing to compare against
+            return None
+        else:
+            activity = events
+        if not activity:
+            return self.task_manager.version, None
+        # id() of an evicted event can be reused by a new one, so match on file and time instead
+        latest = activity[-1]
+        return self.task_manager.version, (latest.get('path') or latest.get('filename'), latest.get('timestamp'))
+
+    def run_check(self, events: Optional[List[Dict]] = None) -> Tuple[str, Optional[str], Optional[Any]]:
         """
         Run the focus check analysis with distraction escalation.
+
+        In local mode, pass ``events`` (a get_recent_activity(10) snapshot) to
+        share one read of the watcher buffer with get_activity_summary().
         Returns:
             Tuple[log_string, alert_js, voice_audio]
         """
@@ -57,16 +188,18 @@ class FocusMonitor:
             return "⚠️ Agent not initialized. Check environment variables.", None, None
 
         active_task = self.task_manager.get_active_task()
+        if not active_task:
+            # Nothing to judge: log locally without the agent, alert or voice
+            with self._lock:
+                self.last_verdict = "Idle"
+            return self._append_log(_NO_TASK_LOG_ENTRY), None, None
 
         # Get recent activity based on mode
         if self.launch_mode == "demo":
-            # In demo mode, create synthetic activity from text content
-            recent_activity = [{
-                'type': 'text_edit',
-                'filename': 'demo_workspace',
-                'content': self.demo_text_content[-500:] if self.demo_text_content else "",
-                'timestamp': time.time()
-            }] if self.demo_text_content else []
+            # In demo mode, use the synthetic activity from the last text save
+            recent_activity = self._demo_activity
+        elif events is not None:
+            recent_activity = events
         else:
             recent_activity = self.file_monitor.get_recent_activity(10)
 
@@ -75,13 +208,15 @@ class FocusMonitor:
         verdict = result.get("verdict", "Unknown")
         message = result.get("message", "No message")
 
-        # Handle distraction escalation logic
-        if verdict == "On Track":
-            # Reset counter when back on track
-            self.consecutive_distracted = 0
-        elif verdict == "Distracted":
-            # Increment distraction counter
-            self.consecutive_distracted += 1
+        with self._lock:
+            self.last_verdict = verdict
+            # Handle distraction escalation logic
+            if verdict == "On Track":
+                # Reset counter when back on track
+                self.consecutive_distracted = 0
+            elif verdict == "Distracted":
+                # Increment distraction counter
+                self.consecutive_distracted += 1
 
         # Log to metrics if we have an active task
         if active_task:
@@ -96,11 +231,7 @@ class FocusMonitor:
         emoji = "✅" if verdict == "On Track" else "⚠️" if verdict == "Distracted" else "💤"
 
         log_entry = f"{emoji} [{verdict}] {message}"
-        self.activity_log.append(log_entry)
-
-        # Keep only last 20 entries
-        if len(self.activity_log) > 20:
-            self.activity_log.pop(0)
+        log_text = self._append_log(log_entry)
 
         # Generate voice feedback (optional, graceful if unavailable)
         voice_audio = None
@@ -113,31 +244,10 @@ class FocusMonitor:
         # Trigger browser alert and audio for distracted/idle status with escalation
         alert_js = None
         if verdict in ["Distracted", "Idle"]:
-            safe_message = json.dumps(message)
-
             # Escalation logic:
             # 1st distraction: play sound only
             # 2nd distraction: play sound again
             # 3rd+ distraction: add voice feedback
-            # play_voice = self.consecutive_distracted >= 3 # Logic handled by caller or voice_audio presence?
-            # Actually voice_audio is generated regardless, but maybe we only play it if distracted?
-            # The original code generated it always if available.
-
-            alert_js = f"""
-            () => {{
-                const audio = document.getElementById('nudge-alert');
-                if (audio) {{
-                    audio.currentTime = 0;
-                    audio.play().catch(e => console.log('Audio play failed:', e));
-                }}
-                if (Notification.permission === "granted") {{
-                    new Notification("FocusFlow Alert 🦉", {{
-                        body: {safe_message},
-                        icon: "https://em-content.zobj.net/thumbs/160/apple/354/owl_1f989.png"
-                    }});
-                }}
-                return null;
-            }}
-            """
-
-        return "\n".join(self.activity_log), alert_js, voice_audio
+            alert_js = _alert_js(message)
+
+        return log_text, alert_js, voice_audio
@@ -113,19 +113,19 @@ def get_all_tasks() -> str:
         Formatted list of all tasks
     """
     try:
-        tasks = task_manager.get_all_tasks()
-        if not tasks:
+        rows = task_manager.get_all_tasks_rows()
+        if not rows:
             return "📝 No tasks yet. Use add_task() to create your first task!"
 
-        result = f"📋 All Tasks ({len(tasks)} total):\n\n"
-        for task in tasks:
-            status_emoji = "✅" if task['status'] == "Done" else "🔄" if task['status'] == "In Progress" else "⏳"
-            result += f"{status_emoji} [{task['id']}] {task['title']}\n"
-            if task.get('description'):
-                result += f"   Description: {task['description']}\n"
-            result += f"   Status: {task['status']} | Duration: {task.get('estimated_duration', 'N/A')}\n\n"
+        lines = [f"📋 All Tasks ({len(rows)} total):\n"]
+        for task_id, title, description, status, duration in rows:
+            status_emoji = "✅" if status == "Done" else "🔄" if status == "In Progress" else "⏳"
+            lines.append(f"{status_emoji} [{task_id}] {title}")
+            if description:
+                lines.append(f"   Description: {description}")
+            lines.append(f"   Status: {status} | Duration: {duration}\n")
 
-        return result.strip()
+        return "\n".join(lines).strip()
     except Exception as e:
         return f"❌ Error getting tasks: {str(e)}"
 
@@ -203,14 +203,14 @@ def get_productivity_stats() -> str:
     """
     try:
         # Task statistics
-        tasks = task_manager.get_all_tasks()
-        if not tasks:
+        status_counts = task_manager.get_status_counts()
+        total = sum(status_counts.values())
+        if not total:
             return "📊 No tasks to analyze yet. Create some tasks to see your productivity stats!"
 
-        total = len(tasks)
-        completed = sum(1 for t in tasks if t['status'] == 'Done')
-        in_progress = sum(1 for t in tasks if t['status'] == 'In Progress')
-        todo = sum(1 for t in tasks if t['status'] == 'Todo')
+        completed = status_counts.get('Done', 0)
+        in_progress = status_counts.get('In Progress', 0)
+        todo = status_counts.get('Todo', 0)
 
         completion_rate = (completed / total * 100) if total > 0 else 0
 
@@ -3,12 +3,15 @@ File monitoring using watchdog with content-aware diff detection.
 """
 import os
 import time
+import asyncio
 from pathlib import Path
-from typing import List, Dict, Optional, Callable
+from typing import Any, Deque, List, Dict, Optional, Callable, Tuple
 from watchdog.observers import Observer
+from watchdog.observers.polling import PollingObserver
 from watchdog.events import FileSystemEventHandler, FileSystemEvent
 from datetime import datetime
 import threading
+from collections import deque
 
 
 class ContentAwareHandler(FileSystemEventHandler):
@@ -26,10 +29,14 @@ class ContentAwareHandler(FileSystemEventHandler):
         '.c', '.cpp', '.h', '.java', '.go', '.rs', '.rb'
     ]
     
+    SUMMARY_CHARS = 200
+    # Events kept for get_recent_events(); older ones drop off the ring
+    EVENT_BUFFER_SIZE = 50
+    
     def __init__(self, callback: Optional[Callable] = None):
         """Initialize the handler with optional callback."""
         super().__init__()
-        self.events: List[Dict] = []
+        self.events: Deque[Dict] = deque(maxlen=self.EVENT_BUFFER_SIZE)
         self.callback = callback
         self.last_event_time = {}
         self.debounce_seconds = 1.0
@@ -49,7 +56,7 @@ class ContentAwareHandler(FileSystemEventHandler):
     def _read_file_content(self, path: str, max_chars: int = 500) -> str:
         """Read last N characters of a text file."""
         try:
-            if not os.path.exists(path) or not os.path.isfile(path):
+            if not os.path.isfile(path):
                 return ""
             
             if not self._is_text_file(path):
@@ -82,20 +89,22 @@ class ContentAwareHandler(FileSystemEventHandler):
         if self._debounce_event(path):
             return
         
+        content = self._read_file_content(path) if event_type == 'modified' else ""
+        filename = os.path.basename(path)
         event_data = {
             'type': event_type,
             'path': path,
-            'filename': os.path.basename(path),
+            'filename': filename,
+            # Display line for the activity summary, formatted once per event
+            'formatted': f"• {event_type.upper()}: {filename}",
             'timestamp': datetime.now().isoformat(),
-            'content': self._read_file_content(path) if event_type == 'modified' else ""
+            'content': content,
+            # Prompt-sized excerpt, computed once instead of on every focus check
+            'summary': content[:self.SUMMARY_CHARS]
         }
         
         self.events.append(event_data)
         
-        # Keep only last 50 events
-        if len(self.events) > 50:
-            self.events = self.events[-50:]
-        
         if self.callback:
             self.callback(event_data)
     
@@ -116,35 +125,102 @@ class ContentAwareHandler(FileSystemEventHandler):
     
     def get_recent_events(self, limit: int = 10) -> List[Dict]:
         """Get the most recent events."""
-        return self.events[-limit:]
+        # One C-level copy, so a concurrent append from the watcher thread can't interleave
+        return list(self.events)[-limit:]
     
     def clear_events(self):
         """Clear all stored events."""
-        self.events = []
+        self.events.clear()
+
+
+# Filesystems where native change notifications miss remote edits
+NETWORK_FS_TYPES = frozenset({
+    'nfs', 'nfs4', 'cifs', 'smbfs', 'smb3', 'afpfs', '9p', 'fuse.sshfs', 'sshfs', 'davfs', 'fuse.rclone',
+})
+
+
+def _is_network_mount(path: str) -> bool:
+    """Best-effort check (Linux /proc/mounts) whether path lives on a network filesystem."""
+    try:
+        with open('/proc/mounts', encoding='utf-8') as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return False
+
+    path = os.path.realpath(path)
+    best, fstype = "", ""
+    for mount_point, mount_type in mounts:
+        mount_point = mount_point.replace('\\040', ' ')
+        if (path == mount_point or path.startswith(mount_point.rstrip('/') + '/')) and len(mount_point) > len(best):
+            best, fstype = mount_point, mount_type
+    return fstype in NETWORK_FS_TYPES
 
 
 class FileMonitor:
     """File monitor using watchdog."""
     
+    # Seconds between directory scans when native notifications are unavailable
+    POLL_INTERVAL = 30
+    
     def __init__(self):
         """Initialize the file monitor."""
         self.observer = None
         self.handler = None
         self.watching_path = None
+        self._subscribers: List[Tuple[Any, Optional[asyncio.AbstractEventLoop]]] = []
+        self._subscribers_lock = threading.Lock()
+    
+    def subscribe(self, q, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """
+        Receive new events (and None on start/stop) on the given queue.
+        Pass the owning loop for an asyncio.Queue so delivery is thread-safe.
+        """
+        with self._subscribers_lock:
+            self._subscribers.append((q, loop))
+    
+    def unsubscribe(self, q):
+        """Stop delivering events to a queue passed to subscribe()."""
+        with self._subscribers_lock:
+            self._subscribers = [sub for sub in self._subscribers if sub[0] is not q]
+    
+    def _publish(self, event: Optional[Dict]):
+        """Fan an event out to all subscribers."""
+        with self._subscribers_lock:
+            subscribers = list(self._subscribers)
+        for q, loop in subscribers:
+            if loop is None:
+                q.put(event)
+                continue
+            try:
+                loop.call_soon_threadsafe(q.put_nowait, event)
+            except RuntimeError:
+                # Loop already closed; its consumer is gone
+                self.unsubscribe(q)
     
     def start(self, path: str, callback: Optional[Callable] = None):
         """Start monitoring a directory."""
         if self.observer and self.observer.is_alive():
             self.stop()
         
-        if not os.path.exists(path):
-            raise ValueError(f"Path does not exist: {path}")
+        if not os.path.isdir(path):
+            raise ValueError(f"Path does not exist or is not a directory: {path}")
+        
+        def on_event(event: Dict):
+            self._publish(event)
+            if callback:
+                callback(event)
         
         self.watching_path = path
-        self.handler = ContentAwareHandler(callback)
-        self.observer = Observer()
+        self.handler = ContentAwareHandler(on_event)
+        # Native observers (inotify/FSEvents/ReadDirectoryChangesW) cost nothing
+        # while idle but don't see changes made from other hosts on network mounts
+        if _is_network_mount(path):
+            self.observer = PollingObserver(timeout=self.POLL_INTERVAL)
+        else:
+            self.observer = Observer()
         self.observer.schedule(self.handler, path, recursive=True)
         self.observer.start()
+        self._publish(None)
     
     def stop(self):
         """Stop monitoring."""
@@ -154,6 +230,7 @@ class FileMonitor:
         self.observer = None
         self.handler = None
         self.watching_path = None
+        self._publish(None)
     
     def get_recent_activity(self, limit: int = 10) -> List[Dict]:
         """Get recent file activity."""
@@ -4,8 +4,12 @@ Ensures app.py and mcp_tools.py share the same state.
 """
 from storage import TaskManager
 from metrics import MetricsTracker
+from dotenv import load_dotenv
 import os
 
+# Load .env before reading any configuration, so every importer sees the same values
+load_dotenv()
+
 # Configuration
 LAUNCH_MODE = os.getenv("LAUNCH_MODE", "demo").lower()
 
@@ -3,9 +3,27 @@ Task Manager with SQLite backend for CRUD operations.
 """
 import sqlite3
 import json
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 import os
+import threading
+from collections import Counter
+from functools import wraps
+from operator import itemgetter
+
+_get_status = itemgetter('status')
+
+
+def _write(method):
+    """Bump TaskManager.version once the wrapped write has finished; a write that raises doesn't."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        # After the commit, so a reader never caches pre-write data under the new version
+        with self._version_lock:
+            self.version += 1
+        return result
+    return wrapper
 
 
 class TaskManager:
@@ -26,6 +44,12 @@ class TaskManager:
         self.use_memory = use_memory
         self.memory_tasks = []  # List of dicts for in-memory storage
         self.memory_counter = 0 # Auto-increment ID for in-memory
+        self.version = 0  # Bumped after every write so readers can cache derived views
+        self._version_lock = threading.Lock()
+        # (version, active task) from the last get_active_task() lookup
+        self._active_cache = (None, None)
+        # (version, {status: count}) behind get_task_counts()/get_status_counts()
+        self._status_counts_cache = (None, {})
 
         if not self.use_memory:
             self._init_db()
@@ -57,6 +81,7 @@ class TaskManager:
             self.memory_tasks = []
             self.memory_counter = 0
 
+    @_write
     def add_task(self, title: str, description: str = "",
                  estimated_duration: str = "", status: str = "Todo") -> int:
         """Add a new task and return its ID."""
@@ -105,6 +130,40 @@ class TaskManager:
         conn.close()
         return task_id
 
+    @_write
+    def add_tasks_bulk(self, rows: List[Tuple[str, str, str, str]]) -> int:
+        """
+        Add several (title, description, estimated_duration, status) tasks at once.
+
+        SQLite inserts share one connection and one transaction.
+        Returns the number of tasks added.
+        """
+        if not rows:
+            return 0
+
+        rows = [(title, description, duration, status if status in self.VALID_STATUSES else "Todo")
+                for title, description, duration, status in rows]
+
+        if self.use_memory:
+            for title, description, duration, status in rows:
+                self.add_task(title, description, duration, status)
+            return len(rows)
+
+        conn = sqlite3.connect(self.db_path)
+        with conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT MAX(position) FROM tasks")
+            result = cursor.fetchone()
+            max_pos = result[0] if result and result[0] is not None else 0
+
+            cursor.executemany("""
+                INSERT INTO tasks (title, description, status, estimated_duration, position)
+                VALUES (?, ?, ?, ?, ?)
+            """, [(title, description, status, duration, max_pos + i)
+                  for i, (title, description, duration, status) in enumerate(rows, start=1)])
+        conn.close()
+        return len(rows)
+
     def get_all_tasks(self) -> List[Dict]:
         """Get all tasks ordered by position."""
         if self.use_memory:
@@ -123,6 +182,72 @@ class TaskManager:
         conn.close()
         return tasks
 
+    def get_all_tasks_rows(self) -> List[Tuple]:
+        """Get all tasks as (id, title, description, status, estimated_duration) tuples."""
+        if self.use_memory:
+            return [
+                (t['id'], t['title'], t['description'], t['status'], t['estimated_duration'])
+                for t in sorted(self.memory_tasks, key=lambda x: x.get('position', 0))
+            ]
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            SELECT id, title, description, status, estimated_duration
+            FROM tasks ORDER BY position
+        """)
+
+        rows = cursor.fetchall()
+        conn.close()
+        return rows
+
+    def get_tasks_page(self, offset: int, limit: int) -> List[Tuple]:
+        """Get one page of task rows (same column order as get_all_tasks_rows)."""
+        if self.use_memory:
+            return self.get_all_tasks_rows()[offset:offset + limit]
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            SELECT id, title, description, status, estimated_duration
+            FROM tasks ORDER BY position LIMIT ? OFFSET ?
+        """, (limit, offset))
+
+        rows = cursor.fetchall()
+        conn.close()
+        return rows
+
+    def get_task_counts(self) -> Tuple[int, int]:
+        """Get (total, done) task counts."""
+        counts = self._status_counts()
+        return sum(counts.values()), counts.get("Done", 0)
+
+    def get_status_counts(self) -> Dict[str, int]:
+        """Get the number of tasks in each status."""
+        return dict(self._status_counts())
+
+    def _status_counts(self) -> Dict[str, int]:
+        """Per-status counts, counted again only after a write."""
+        version, counts = self._status_counts_cache
+        current = self.version  # read before loading; a write landing mid-load bumps it again
+        if version != current:
+            counts = self._load_status_counts()
+            self._status_counts_cache = (current, counts)
+        return counts
+
+    def _load_status_counts(self) -> Dict[str, int]:
+        if self.use_memory:
+            return dict(Counter(map(_get_status, self.memory_tasks)))
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status")
+        counts = dict(cursor.fetchall())
+        conn.close()
+        return counts
+
     def get_task(self, task_id: int) -> Optional[Dict]:
         """Get a specific task by ID."""
         if self.use_memory:
@@ -144,6 +269,7 @@ class TaskManager:
         conn.close()
         return dict(row) if row else None
 
+    @_write
     def update_task(self, task_id: int, **kwargs):
         """Update a task's fields with validation."""
         # Validate status if provided
@@ -181,6 +307,7 @@ class TaskManager:
 
         conn.close()
 
+    @_write
     def delete_task(self, task_id: int):
         """Delete a task by ID."""
         if self.use_memory:
@@ -193,6 +320,7 @@ class TaskManager:
         conn.commit()
         conn.close()
 
+    @_write
     def reorder_tasks(self, task_ids: List[int]):
         """Reorder tasks based on new order."""
         if self.use_memory:
@@ -215,7 +343,15 @@ class TaskManager:
         conn.close()
 
     def get_active_task(self) -> Optional[Dict]:
-        """Get the task marked as 'In Progress'."""
+        """Get the task marked as 'In Progress' (looked up again only after a write)."""
+        version, task = self._active_cache
+        current = self.version  # read before loading; a write landing mid-load bumps it again
+        if version != current:
+            task = self._load_active_task()
+            self._active_cache = (current, task)
+        return dict(task) if task else None
+
+    def _load_active_task(self) -> Optional[Dict]:
         if self.use_memory:
             # Filter for In Progress tasks and sort by position
             active_tasks = [t for t in self.memory_tasks if t['status'] == 'In Progress']
@@ -238,6 +374,7 @@ class TaskManager:
         conn.close()
         return dict(row) if row else None
 
+    @_write
     def set_active_task(self, task_id: int) -> bool:
         """Set a task as 'In Progress' and ensure only one task has this status.
         Returns True if successful, False otherwise."""
@@ -298,6 +435,7 @@ class TaskManager:
         conn.close()
         return True
 
+    @_write
     def clear_all_tasks(self):
         """Clear all tasks from the database."""
         if self.use_memory:
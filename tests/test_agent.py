@@ -0,0 +1,472 @@
+import asyncio
+import json
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from agent import FocusAgent, MockFocusAgent, _agent_loop, _run_sync
+
+
+class _FakeStream:
+    """Minimal stand-in for a streamed chat.completions response."""
+
+    def __init__(self, content, size=8):
+        self.parts = [content[i:i + size] for i in range(0, len(content), size)]
+
+    async def __aiter__(self):
+        for part in self.parts:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=part))])
+
+
+def _openai_response(content):
+    """Build a streamed chat.completions response object."""
+    return _FakeStream(content)
+
+
+class TestFocusAgent(unittest.TestCase):
+    def setUp(self):
+        self.agent = FocusAgent(provider="openai", api_key="sk-test", quick_verdicts=False)
+        self.agent.client = MagicMock()
+        self.agent.client.chat.completions.create = AsyncMock(return_value=_openai_response(
+            json.dumps({"verdict": "On Track", "message": "Nice", "reasoning": "ok"})
+        ))
+        self.task = {"id": 1, "title": "Build login form", "description": "HTML form"}
+
+    def test_analyze_sync_wrapper(self):
+        result = self.agent.analyze(self.task, [])
+        self.assertEqual(result["verdict"], "On Track")
+        self.assertIn("timestamp", result)
+
+    def test_analyze_many(self):
+        other = {"id": 2, "title": "Write tests", "description": "pytest"}
+        items = [(self.task, []), (other, []), (None, [])]
+        results = asyncio.run(self.agent.analyze_many(items))
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[2]["verdict"], "Idle")
+        self.assertEqual(self.agent.client.chat.completions.create.await_count, 2)
+
+    def test_onboarding_tasks(self):
+        self.agent.client.chat.completions.create.return_value = _openai_response(
+            json.dumps({"tasks": [{"title": "A", "description": "B", "estimated_duration": "15 min"}]})
+        )
+        tasks = self.agent.get_onboarding_tasks("A todo app")
+        self.assertEqual(tasks[0]["title"], "A")
+
+
+class TestAgentLoop(unittest.TestCase):
+    def test_calls_from_other_loops_run_on_agent_loop(self):
+        agent = FocusAgent(provider="openai", api_key="sk-test", quick_verdicts=False)
+        agent.client = MagicMock()
+        loops = []
+
+        async def create(**kwargs):
+            loops.append(asyncio.get_running_loop())
+            return _openai_response(json.dumps({"verdict": "On Track", "message": "Nice", "reasoning": "ok"}))
+
+        agent.client.chat.completions.create = create
+
+        async def stream():
+            return [item async for item in agent.analyze_stream({"id": 2, "title": "Tests"}, [])]
+
+        # Each asyncio.run() is a fresh loop; the pooled client must only ever see the agent's
+        asyncio.run(agent.analyze_async({"id": 1, "title": "Form"}, []))
+        self.assertEqual(asyncio.run(stream())[-1]["message"], "Nice")
+        self.assertEqual(loops, [_agent_loop()] * 2)
+
+
+class TestMockFocusAgent(unittest.TestCase):
+    def test_analyze_many(self):
+        agent = MockFocusAgent()
+        results = asyncio.run(agent.analyze_many([({"id": 1, "title": "T"}, [])] * 3))
+        self.assertEqual([r["verdict"] for r in results], ["On Track", "On Track", "Distracted"])
+
+
+class TestClientCache(unittest.TestCase):
+    def test_clients_are_reused(self):
+        a = FocusAgent(provider="anthropic", api_key="sk-ant-test", quick_verdicts=False)
+        b = FocusAgent(provider="anthropic", api_key="sk-ant-test", quick_verdicts=False)
+        c = FocusAgent(provider="openai", api_key="sk-test", quick_verdicts=False)
+        self.assertIs(a.client, b.client)
+        self.assertIsNot(a.client, c.client)
+
+
+class TestVerdictCache(unittest.TestCase):
+    def setUp(self):
+        self.agent = FocusAgent(provider="openai", api_key="sk-test", quick_verdicts=False)
+        self.agent.client = MagicMock()
+        self.agent.client.chat.completions.create = AsyncMock(return_value=_openai_response(
+            json.dumps({"verdict": "Distracted", "message": "Hey", "reasoning": "off-task"})
+        ))
+        self.task = {"id": 1, "title": "Build login form", "description": "HTML form"}
+        self.activity = [{"type": "modified", "filename": "game.py", "content": "print('hi')"}]
+
+    def test_repeat_inputs_hit_cache(self):
+        first = self.agent.analyze(self.task, self.activity)
+        second = self.agent.analyze(self.task, self.activity)
+        self.assertEqual(first["verdict"], second["verdict"])
+        self.assertEqual(self.agent.client.chat.completions.create.await_count, 1)
+        # Streak tracking still advances on cache hits
+        self.assertTrue(second["should_alert"])
+
+    def test_changed_activity_misses_cache(self):
+        self.agent.analyze(self.task, self.activity)
+        self.agent.analyze(self.task, self.activity + [{"type": "modified", "filename": "login.html"}])
+        self.assertEqual(self.agent.client.chat.completions.create.await_count, 2)
+
+    def test_near_duplicate_content_reuses_verdict(self):
+        content = "def handle_login(user, password):\n    return check(user, password)\n" * 2
+        self.agent.analyze(self.task, [{"type": "modified", "filename": "game.py", "content": content}])
+        self.agent.analyze(self.task, [{"type": "modified", "filename": "game.py", "content": content + "#"}])
+        self.assertEqual(self.agent.client.chat.completions.create.await_count, 1)
+
+        self.agent.analyze(self.task, [{"type": "modified", "filename": "other.py", "content": content}])
+        self.assertEqual(self.agent.client.chat.completions.create.await_count, 2)
+
+    def test_same_files_serve_stale_verdict_and_refresh(self):
+        async def run():
+            first = await self.agent.analyze_async(self.task, self.activity)
+            self.agent.client.chat.completions.create.return_value = _openai_response(
+                json.dumps({"verdict": "On Track", "message": "Nice", "reasoning": "on-task"}))
+            edited = [{"type": "modified", "filename": "game.py", "content": "class LoginForm: pass"}]
+            stale = await self.agent.analyze_async(self.task, edited)
+            await asyncio.gather(*self.agent._refreshes)
+            fresh = await self.agent.analyze_async(self.task, edited)
+            return first, stale, fresh
+
+        # Background refreshes run on the agent loop, so await them there
+        first, stale, fresh = _run_sync(run())
+        self.assertEqual(stale["verdict"], first["verdict"])
+        self.assertEqual(fresh["verdict"], "On Track")
+        self.assertEqual(self.agent.client.chat.completions.create.await_count, 2)
+
+    def test_fallback_not_cached(self):
+        self.agent.client.chat.completions.create.side_effect = RuntimeError("boom")
+        self.agent.analyze(self.task, self.activity)
+        self.agent.analyze(self.task, self.activity)
+        self.assertEqual(self.agent.client.chat.completions.create.await_count, 2)
+
+
+class TestPromptLayout(unittest.TestCase):
+    def test_static_instructions_sent_as_system_prefix(self):
+        agent = FocusAgent(provider="openai", api_key="sk-test", quick_verdicts=False)
+        agent.client = MagicMock()
+        agent.client.chat.completions.create = AsyncMock(return_value=_openai_response(
+            json.dumps({"verdict": "Idle", "message": "Hoot", "reasoning": "none"})
+        ))
+        agent.analyze({"id": 1, "title": "Tetris clone"}, [])
+        messages = agent.client.chat.completions.create.call_args.kwargs["messages"]
+        self.assertEqual(messages[0]["role"], "system")
+        self.assertNotIn("Tetris clone", messages[0]["content"])
+        self.assertIn("Tetris clone", messages[1]["content"])
+
+
+class TestAnalyzeStream(unittest.TestCase):
+    def test_partial_messages_then_final(self):
+        agent = FocusAgent(provider="openai", api_key="sk-test", quick_verdicts=False)
+        agent.client = MagicMock()
+        agent.client.chat.completions.create = AsyncMock(return_value=_openai_response(
+            json.dumps({"verdict": "On Track", "message": "Great job on the form!", "reasoning": "ok"})
+        ))
+
+        async def collect():
+            return [item async for item in agent.analyze_stream({"id": 1, "title": "Form"}, [])]
+
+        items = asyncio.run(collect())
+        partials = [i["message"] for i in items if i.get("partial")]
+        self.assertTrue(partials)
+        self.assertTrue("Great job on the form!".startswith(partials[0]))
+        self.assertEqual(items[-1]["verdict"], "On Track")
+        self.assertEqual(items[-1]["message"], "Great job on the form!")
+        self.assertTrue(agent.client.chat.completions.create.call_args.kwargs["stream"])
+
+    def test_escapes_split_across_deltas(self):
+        agent = FocusAgent(provider="openai", api_key="sk-test", quick_verdicts=False)
+        agent.client = MagicMock()
+
+        async def collect():
+            return [item async for item in agent.analyze_stream({"id": 1, "title": "Form"}, [])]
+
+        # json.dumps writes \u00e9 and a surrogate pair for the emoji; every delta size splits some escape
+        for message in ('Say "hi" to the \\ form', "Caf\u00e9 login form \U0001F600 done"):
+            for size in range(1, 8):
+                with self.subTest(message=message, size=size):
+                    agent.clear_verdict_cache()
+                    content = json.dumps({"verdict": "On Track", "message": message, "reasoning": "ok"})
+                    agent.client.chat.completions.create = AsyncMock(return_value=_FakeStream(content, size=size))
+                    items = asyncio.run(collect())
+                    partials = [i["message"] for i in items if i.get("partial")]
+                    self.assertTrue(all(message.startswith(p) for p in partials))
+                    self.assertEqual(partials[-1], message)
+                    self.assertEqual(items[-1]["message"], message)
+
+
+class TestExtractJson(unittest.TestCase):
+    def test_fenced_and_plain(self):
+        from agent import _extract_json
+        self.assertEqual(_extract_json('```json\n{"a": 1}\n```'), '{"a": 1}')
+        self.assertEqual(_extract_json('Sure!\n```\n[1, 2]\n```'), '[1, 2]')
+        self.assertEqual(_extract_json('  {"a": 1} '), '{"a": 1}')
+
+
+class _FakeAnthropicStream:
+    """Async context manager yielding tool-input JSON deltas."""
+
+    def __init__(self, content, size=8):
+        self.events = [
+            SimpleNamespace(type="content_block_delta",
+                            delta=SimpleNamespace(type="input_json_delta", partial_json=content[i:i + size]))
+            for i in range(0, len(content), size)
+        ]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def __aiter__(self):
+        for event in self.events:
+            yield event
+
+
+class TestStructuredOutput(unittest.TestCase):
+    def test_openai_requests_json_schema(self):
+        agent = FocusAgent(provider="openai", api_key="sk-test", quick_verdicts=False)
+        agent.client = MagicMock()
+        agent.client.chat.completions.create = AsyncMock(return_value=_openai_response(
+            json.dumps({"verdict": "Idle", "message": "Hoot", "reasoning": "none"})
+        ))
+        agent.analyze({"id": 1, "title": "Form"}, [])
+        response_format = agent.client.chat.completions.create.call_args.kwargs["response_format"]
+        self.assertEqual(response_format["type"], "json_schema")
+        self.assertEqual(response_format["json_schema"]["name"], "report_verdict")
+
+    def test_anthropic_forced_tool_call(self):
+        agent = FocusAgent(provider="anthropic", api_key="sk-ant-test", quick_verdicts=False)
+        agent.client = MagicMock()
+        agent.client.messages.stream = MagicMock(return_value=_FakeAnthropicStream(
+            json.dumps({"verdict": "Distracted", "message": "Eyes up!", "reasoning": "off-task"})
+        ))
+        result = agent.analyze({"id": 1, "title": "Form"}, [{"type": "modified", "filename": "x.py"}])
+        self.assertEqual(result["verdict"], "Distracted")
+        kwargs = agent.client.messages.stream.call_args.kwargs
+        self.assertEqual(kwargs["tool_choice"], {"type": "tool", "name": "report_verdict"})
+
+    def test_anthropic_caches_system_prompt(self):
+        agent = FocusAgent(provider="anthropic", api_key="sk-ant-test", quick_verdicts=False)
+        agent.client = MagicMock()
+        agent.client.messages.stream = MagicMock(return_value=_FakeAnthropicStream(
+            json.dumps({"verdict": "On Track", "message": "Nice", "reasoning": "ok"})
+        ))
+        agent.analyze({"id": 1, "title": "Form"}, [{"type": "modified", "filename": "x.py"}])
+
+        system = agent.client.messages.stream.call_args.kwargs["system"]
+        self.assertEqual(system[0]["cache_control"], {"type": "ephemeral"})
+
+
+class TestActivityWindow(unittest.TestCase):
+    def test_compact_keeps_last_five_truncated(self):
+        from agent import _compact_activity, _format_activity
+        events = [{"type": "modified", "filename": f"f{i}.py", "content": "x" * 500} for i in range(8)]
+        window = _compact_activity(events)
+        self.assertEqual(len(window), 5)
+        self.assertEqual(window[0][1], "f3.py")
+        self.assertEqual(len(window[0][2]), 200)
+        self.assertIn("- MODIFIED: f7.py", _format_activity(window))
+
+    def test_repeated_saves_keep_latest_per_file(self):
+        from agent import _compact_activity
+        events = [{"type": "modified", "filename": name, "content": f"v{i}"}
+                  for i, name in enumerate(["a.py", "b.py", "a.py", "a.py", "c.py", "a.py"])]
+        window = _compact_activity(events)
+        self.assertEqual([(f, c) for _, f, c in window], [("b.py", "v1"), ("c.py", "v4"), ("a.py", "v5")])
+
+    def test_precomputed_summary_is_used(self):
+        from agent import _compact_activity
+        window = _compact_activity([{"type": "modified", "filename": "a.py",
+                                     "content": "x" * 500, "summary": "short"}])
+        self.assertEqual(window[0][2], "short")
+
+
+class TestPlanMany(unittest.TestCase):
+    def test_openai_batch_results_in_order(self):
+        agent = FocusAgent(provider="openai", api_key="sk-test", quick_verdicts=False)
+        agent.client = MagicMock()
+        agent.client.files.create = AsyncMock(return_value=SimpleNamespace(id="file-in"))
+        agent.client.batches.create = AsyncMock(return_value=SimpleNamespace(
+            id="batch-1", status="completed", output_file_id="file-out"))
+
+        def line(i, title):
+            body = {"choices": [{"message": {"content": json.dumps({"tasks": [{"title": title}]})}}]}
+            return json.dumps({"custom_id": f"plan-{i}", "response": {"status_code": 200, "body": body}})
+
+        agent.client.files.content = AsyncMock(return_value=SimpleNamespace(
+            text="\n".join([line(1, "Second"), line(0, "First")])))
+
+        plans = agent.plan_many(["project a", "project b", "project c"], poll_interval=0)
+        self.assertEqual([p[0]["title"] if p else None for p in plans], ["First", "Second", None])
+
+    def test_mock_agent_falls_back_to_concurrent_calls(self):
+        plans = MockFocusAgent().plan_many(["a web app", "an api server"])
+        self.assertEqual(len(plans), 2)
+        self.assertTrue(all(plans))
+
+
+class TestVllmStructuredOutput(unittest.TestCase):
+    def test_vllm_uses_guided_json(self):
+        agent = FocusAgent(provider="openai", api_key="sk-test", quick_verdicts=False)
+        agent.provider = "vllm"
+        agent.client = MagicMock()
+        agent.client.models.list = AsyncMock(return_value=SimpleNamespace(data=[]))
+        agent.client.chat.completions.create = AsyncMock(return_value=_openai_response(
+            json.dumps({"verdict": "Idle", "message": "Hoot", "reasoning": "none"})
+        ))
+        agent.analyze({"id": 1, "title": "Form"}, [])
+        kwargs = agent.client.chat.completions.create.call_args.kwargs
+        self.assertIn("guided_json", kwargs["extra_body"])
+        self.assertNotIn("response_format", kwargs)
+
+
+class TestVllmHealthCheck(unittest.TestCase):
+    def test_probe_is_lazy_and_cached(self):
+        agent = FocusAgent(provider="vllm", base_url="http://localhost:9/v1")
+        # Unknown until the first probe
+        self.assertFalse(agent.connection_healthy)
+        agent.client = MagicMock()
+        agent.client.models.list = AsyncMock(return_value=SimpleNamespace(data=[SimpleNamespace(id="m")]))
+        agent.client.chat.completions.create = AsyncMock(return_value=_openai_response(
+            json.dumps({"verdict": "On Track", "message": "Nice", "reasoning": "ok"})
+        ))
+        agent.analyze({"id": 1, "title": "Form"}, [])
+        agent.analyze({"id": 2, "title": "Tests"}, [])
+        self.assertEqual(agent.client.models.list.await_count, 1)
+        self.assertEqual(agent._available_models, ["m"])
+
+    def test_failed_probe_marks_unhealthy(self):
+        agent = FocusAgent(provider="vllm", base_url="http://localhost:9/v1")
+        agent.client = MagicMock()
+        agent.client.models.list = AsyncMock(side_effect=ConnectionError("down"))
+        result = agent.analyze({"id": 1, "title": "Form"}, [])
+        self.assertFalse(agent.connection_healthy)
+        self.assertIn("not reachable", result["message"])
+
+
+class TestRetry(unittest.TestCase):
+    def setUp(self):
+        from tenacity import wait_none
+        from agent import _call_with_retry
+        self._retrying = (FocusAgent._chat, _call_with_retry)
+        self._waits = [f.retry.wait for f in self._retrying]
+        for f in self._retrying:
+            f.retry.wait = wait_none()
+        self.agent = FocusAgent(provider="openai", api_key="sk-test", quick_verdicts=False)
+        self.agent.client = MagicMock()
+
+    def tearDown(self):
+        for f, wait in zip(self._retrying, self._waits):
+            f.retry.wait = wait
+
+    def _server_error(self):
+        import httpx
+        import openai
+        response = httpx.Response(503, request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+        return openai.InternalServerError("overloaded", response=response, body=None)
+
+    def test_transient_error_is_retried(self):
+        self.agent.client.chat.completions.create = AsyncMock(side_effect=[
+            self._server_error(),
+            _openai_response(json.dumps({"verdict": "On Track", "message": "Nice", "reasoning": "ok"}))
+        ])
+        result = self.agent.analyze({"id": 1, "title": "Form"}, [])
+        self.assertEqual(result["verdict"], "On Track")
+        self.assertEqual(result["message"], "Nice")
+        self.assertEqual(self.agent.client.chat.completions.create.await_count, 2)
+
+    def test_stream_is_retried(self):
+        self.agent.client.chat.completions.create = AsyncMock(side_effect=[
+            self._server_error(),
+            _openai_response(json.dumps({"verdict": "On Track", "message": "Nice", "reasoning": "ok"}))
+        ])
+
+        async def collect():
+            return [item async for item in self.agent.analyze_stream({"id": 1, "title": "Form"}, [])]
+
+        self.assertEqual(asyncio.run(collect())[-1]["message"], "Nice")
+        self.assertEqual(self.agent.client.chat.completions.create.await_count, 2)
+
+    def test_batch_poll_is_retried(self):
+        self.agent.client.files.create = AsyncMock(return_value=SimpleNamespace(id="file-in"))
+        self.agent.client.batches.create = AsyncMock(return_value=SimpleNamespace(
+            id="batch-1", status="in_progress", output_file_id=None))
+        self.agent.client.batches.retrieve = AsyncMock(side_effect=[
+            self._server_error(),
+            SimpleNamespace(id="batch-1", status="failed", output_file_id=None)
+        ])
+        self.assertEqual(self.agent.plan_many(["project a"], poll_interval=0), [[]])
+        self.assertEqual(self.agent.client.batches.retrieve.await_count, 2)
+
+    def test_permanent_error_falls_back_immediately(self):
+        self.agent.client.chat.completions.create = AsyncMock(side_effect=ValueError("bad request"))
+        result = self.agent.analyze({"id": 1, "title": "Form"}, [])
+        self.assertEqual(result["reasoning"], "Error occurred")
+        self.assertEqual(self.agent.client.chat.completions.create.await_count, 1)
+
+
+class TestQuickVerdict(unittest.TestCase):
+    def setUp(self):
+        self.agent = FocusAgent(provider="openai", api_key="sk-test")
+        self.agent.client = MagicMock()
+        self.agent.client.chat.completions.create = AsyncMock(return_value=_openai_response(
+            json.dumps({"verdict": "Distracted", "message": "Hey", "reasoning": "off-task"})
+        ))
+        self.task = {"id": 1, "title": "Build login form", "description": "HTML form with validation"}
+
+    def test_no_activity_is_idle_without_llm(self):
+        result = self.agent.analyze(self.task, [])
+        self.assertEqual(result["verdict"], "Idle")
+        self.agent.client.chat.completions.create.assert_not_awaited()
+
+    def test_matching_filenames_are_on_track(self):
+        result = self.agent.analyze(self.task, [{"type": "modified", "filename": "login_form.html"},
+                                                {"type": "modified", "filename": "validation.js"}])
+        self.assertEqual(result["verdict"], "On Track")
+        self.agent.client.chat.completions.create.assert_not_awaited()
+
+    def test_ambiguous_activity_escalates(self):
+        result = self.agent.analyze(self.task, [{"type": "modified", "filename": "login.html"},
+                                                {"type": "modified", "filename": "game.py"}])
+        self.assertEqual(result["verdict"], "Distracted")
+        self.assertEqual(self.agent.client.chat.completions.create.await_count, 1)
+
+
+class TestStreakCounters(unittest.TestCase):
+    def test_packed_counters_track_streaks(self):
+        agent = MockFocusAgent()
+        agent._finalize_verdict({"verdict": "Idle"})
+        self.assertTrue(agent._finalize_verdict({"verdict": "Idle"})["should_alert"])
+        self.assertEqual((agent.idle_count, agent.distracted_count), (2, 0))
+        agent._finalize_verdict({"verdict": "Distracted"})
+        self.assertEqual((agent.idle_count, agent.distracted_count), (0, 1))
+        agent._finalize_verdict({"verdict": "On Track"})
+        self.assertEqual((agent.idle_count, agent.distracted_count), (0, 0))
+
+
+class TestRequestCoalescing(unittest.TestCase):
+    def test_concurrent_identical_checks_share_one_call(self):
+        agent = FocusAgent(provider="openai", api_key="sk-test", quick_verdicts=False)
+        agent.client = MagicMock()
+
+        async def slow_create(**kwargs):
+            await asyncio.sleep(0.05)
+            return _openai_response(json.dumps({"verdict": "On Track", "message": "Nice", "reasoning": "ok"}))
+
+        agent.client.chat.completions.create = AsyncMock(side_effect=slow_create)
+        task = {"id": 1, "title": "Form"}
+        activity = [{"type": "modified", "filename": "form.html"}]
+        results = asyncio.run(agent.analyze_many([(task, activity)] * 3))
+        self.assertEqual([r["verdict"] for r in results], ["On Track"] * 3)
+        self.assertEqual(agent.client.chat.completions.create.await_count, 1)
+
+        agent.clear_verdict_cache()
+        agent.analyze(task, activity)
+        self.assertEqual(agent.client.chat.completions.create.await_count, 2)
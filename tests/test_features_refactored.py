@@ -39,8 +39,8 @@ class TestCheckFrequency:
             "10 minutes": 600,
         }
         for label, expected_seconds in test_cases.items():
-            timer, msg = self.handlers.set_check_interval(label)
-            assert timer.value == expected_seconds
+            timer, msg, interval = self.handlers.set_check_interval(label)
+            assert timer.value == interval == expected_seconds
             assert self.handlers.check_interval == expected_seconds
 
 class TestDistractionEscalation:
@@ -1,6 +1,8 @@
+import asyncio
+import time
 import unittest
 from unittest.mock import MagicMock
-from core.focus_check import FocusMonitor
+from core.focus_check import ACTIVITY_LOG_SIZE, DEMO_TAIL_CHARS, FocusMonitor
 
 class TestFocusMonitor(unittest.TestCase):
     def setUp(self):
@@ -26,6 +28,30 @@ class TestFocusMonitor(unittest.TestCase):
         self.assertIn("On Track", log)
         self.assertIsNone(alert)
 
+    def test_check_without_task_skips_agent(self):
+        agent = MagicMock()
+        self.monitor.set_agent(agent)
+        self.tm.get_active_task.return_value = None
+
+        log, alert, voice = self.monitor.run_check()
+        self.assertIn("No active task", log)
+        self.assertIsNone(alert)
+        agent.analyze.assert_not_called()
+        self.fm.get_recent_activity.assert_not_called()
+
+    def test_log_text_tracks_bounded_log(self):
+        self.monitor.activity_log = [f"Entry {i}" for i in range(ACTIVITY_LOG_SIZE - 1)]
+        for i in range(3):
+            text = self.monitor._append_log(f"New {i}")
+            self.assertEqual(text, "\n".join(self.monitor.activity_log))
+        self.assertEqual(len(self.monitor.activity_log), ACTIVITY_LOG_SIZE)
+
+    def test_concurrent_appends_keep_text_in_step(self):
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(self.monitor._append_log, (f"Entry {i}" for i in range(500))))
+        self.assertEqual(self.monitor.activity_log_text, "\n".join(self.monitor.activity_log))
+
     def test_check_distracted(self):
         agent = MagicMock()
         agent.analyze.return_value = {"verdict": "Distracted", "message": "Stop browsing"}
@@ -35,4 +61,91 @@ class TestFocusMonitor(unittest.TestCase):
 
         log, alert, voice = self.monitor.run_check()
         self.assertIn("Distracted", log)
+        self.assertIn('body: "Stop browsing",', alert)
+
+    def test_check_async(self):
+        agent = MagicMock()
+        agent.analyze.return_value = {"verdict": "On Track", "message": "Good job"}
+        self.monitor.set_agent(agent)
+
+        self.tm.get_active_task.return_value = {"id": 1, "title": "Test"}
+        self.fm.get_recent_activity.return_value = []
+
+        log, alert, voice = asyncio.run(self.monitor.run_check_async())
+        self.assertIn("Good job", log)
+        self.assertIsNone(alert)
+
+    def test_overlapping_async_checks_share_one_call(self):
+        agent = MagicMock()
+        agent.analyze.side_effect = lambda *_: time.sleep(0.05) or {"verdict": "On Track", "message": "Good job"}
+        self.monitor.set_agent(agent)
+        self.tm.get_active_task.return_value = {"id": 1, "title": "Test"}
+        self.fm.get_recent_activity.return_value = []
+
+        async def run():
+            return await asyncio.gather(self.monitor.run_check_async(), self.monitor.run_check_async())
+
+        first, second = asyncio.run(run())
+        self.assertEqual(first, second)
+        self.assertEqual(agent.analyze.call_count, 1)
+
+    def test_recent_check_reused_until_activity_changes(self):
+        agent = MagicMock()
+        agent.analyze.return_value = {"verdict": "On Track", "message": "Good job"}
+        self.monitor.set_agent(agent)
+        self.tm.get_active_task.return_value = {"id": 1, "title": "Test"}
+        events = [{"type": "modified", "filename": "a.py", "timestamp": "2025-01-01T10:00:00"}]
+
+        first = asyncio.run(self.monitor.run_check_async(events))
+        # A fresh snapshot of the same events is the same activity
+        self.assertEqual(asyncio.run(self.monitor.run_check_async([dict(e) for e in events])), first)
+        self.assertEqual(agent.analyze.call_count, 1)
+
+        asyncio.run(self.monitor.run_check_async(
+            events + [{"type": "modified", "filename": "b.py", "timestamp": "2025-01-01T10:00:01"}]))
+        self.assertEqual(agent.analyze.call_count, 2)
+
+        # Saving the same file again is new activity
+        asyncio.run(self.monitor.run_check_async(
+            events + [{"type": "modified", "filename": "b.py", "timestamp": "2025-01-01T10:00:02"}]))
+        self.assertEqual(agent.analyze.call_count, 3)
+
+    def test_reused_check_does_not_alert_again(self):
+        agent = MagicMock()
+        agent.analyze.return_value = {"verdict": "Distracted", "message": "Hey!", "should_alert": True}
+        self.monitor.set_agent(agent)
+        self.tm.get_active_task.return_value = {"id": 1, "title": "Test"}
+        events = [{"type": "modified", "filename": "game.py", "timestamp": "2025-01-01T10:00:00"}]
+
+        log, alert, _ = asyncio.run(self.monitor.run_check_async(events))
         self.assertIsNotNone(alert)
+        self.assertEqual(asyncio.run(self.monitor.run_check_async(events)), (log, None, None))
+        self.assertEqual(agent.analyze.call_count, 1)
+
+    def test_demo_mode_sends_text_tail(self):
+        agent = MagicMock()
+        agent.analyze.return_value = {"verdict": "On Track", "message": "Good job"}
+        self.monitor.set_agent(agent)
+        self.monitor.set_launch_mode("demo")
+        self.tm.get_active_task.return_value = {"id": 1, "title": "Test"}
+
+        self.monitor.update_demo_text("x" * 1000 + "def login(): pass")
+        self.monitor.run_check()
+        activity = agent.analyze.call_args.args[1]
+        self.assertEqual(len(activity[0]["content"]), DEMO_TAIL_CHARS)
+        self.assertTrue(activity[0]["content"].endswith("def login(): pass"))
+        self.assertIn("1017 characters", self.monitor.get_activity_summary(False))
+
+    def test_shared_event_snapshot(self):
+        agent = MagicMock()
+        agent.analyze.return_value = {"verdict": "On Track", "message": "Good job"}
+        self.monitor.set_agent(agent)
+        self.tm.get_active_task.return_value = {"id": 1, "title": "Test"}
+        events = [{"type": "modified", "filename": f"f{i}.py"} for i in range(7)]
+
+        self.monitor.run_check(events)
+        summary = self.monitor.get_activity_summary(True, events)
+
+        agent.analyze.assert_called_once_with({"id": 1, "title": "Test"}, events)
+        self.assertEqual(summary.splitlines()[0], "• MODIFIED: f2.py")
+        self.fm.get_recent_activity.assert_not_called()
@@ -0,0 +1,215 @@
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+
+from storage import TaskManager
+from ui.handlers import UIHandlers
+
+
+class TestTaskTableCache(unittest.TestCase):
+    def setUp(self):
+        self.tm = TaskManager(use_memory=True)
+        self.handlers = UIHandlers(self.tm, MagicMock(), MagicMock(), MagicMock())
+
+    def test_rows_reused_until_write(self):
+        self.tm.add_task("First", "A", "15 min")
+        rows = self.handlers.get_task_dataframe()
+        self.assertIs(self.handlers.get_task_dataframe(), rows)
+
+        self.tm.add_task("Second", "B", "20 min")
+        rows = self.handlers.get_task_dataframe()
+        self.assertEqual([r[1] for r in rows], ["First", "Second"])
+
+    def test_progress_recomputed_only_after_write(self):
+        first = self.tm.add_task("First", "A", "15 min")
+        self.tm.add_task("Second", "B", "20 min")
+        self.assertEqual(self.handlers.calculate_progress(), 0.0)
+
+        with patch.object(self.tm, "_load_status_counts", side_effect=AssertionError("cache miss")):
+            self.assertEqual(self.handlers.calculate_progress(), 0.0)
+            self.assertEqual(self.handlers.get_task_page_count(), 1)
+
+        self.tm.update_task(first, status="Done")
+        self.assertEqual(self.handlers.calculate_progress(), 50.0)
+
+    def test_onboarding_error_keeps_progress(self):
+        task_id = self.tm.add_task("First", "A", "15 min")
+        self.tm.update_task(task_id, status="Done")
+        status, rows, progress, *_ = self.handlers.process_onboarding("   ")
+        self.assertIn("describe your project", status)
+        self.assertEqual((len(rows), progress), (1, 100.0))
+
+    def test_blank_title_sends_no_updates(self):
+        self.tm.get_tasks_page = MagicMock(side_effect=AssertionError("table re-read"))
+        outputs = self.handlers.add_new_task("  ", "desc", 30, "Todo")
+        self.assertEqual(outputs, ({"__type__": "update"},) * 9)
+
+    def test_task_buttons_without_selection_skip_table(self):
+        self.tm.get_tasks_page = MagicMock(side_effect=AssertionError("table re-read"))
+        for handler in (self.handlers.set_task_active, self.handlers.mark_task_done, self.handlers.delete_task):
+            status, *view = handler(None)
+            self.assertIn("No task selected", status)
+            self.assertEqual(view, [{"__type__": "update"}] * 5)
+
+    def test_start_done_task_reports_failure(self):
+        task_id = self.tm.add_task("First", "A", "15 min")
+        self.handlers.mark_task_done(str(task_id))
+        status, rows, progress, *_ = self.handlers.set_task_active(str(task_id))
+        self.assertIn("already done", status)
+        self.assertEqual((rows[0][3], progress), ("Done", 100.0))
+
+    def test_check_interval_leaves_timer_state_alone(self):
+        timer, _, interval = self.handlers.set_check_interval("1 minute")
+        self.assertEqual((timer.constructor_args, interval), ({"value": 60}, 60))
+
+        # Local mode's idle-fallback timer runs at a multiple of the check interval
+        timer, _, interval = self.handlers.set_check_interval("1 minute", 10)
+        self.assertEqual((timer.constructor_args, interval, self.handlers.check_interval), ({"value": 600}, 600, 60))
+
+    def test_stop_without_start_leaves_watcher_alone(self):
+        self.handlers.stop_monitoring()
+        self.handlers.file_monitor.stop.assert_not_called()
+
+    def test_error_status_is_truncated(self):
+        self.tm.delete_task = MagicMock(side_effect=RuntimeError("x" * 500))
+        with patch("builtins.print") as printed:
+            status, *_ = self.handlers.delete_task("1")
+        self.assertEqual(status, "❌ Error: " + "x" * 80)
+        self.assertIn("x" * 500, printed.call_args.args[0])
+
+
+class TestTableDiff(unittest.TestCase):
+    def test_unchanged_table_is_skipped(self):
+        from ui.layout import with_table_diff
+        tm = TaskManager(use_memory=True)
+        handlers = UIHandlers(tm, MagicMock(), MagicMock(), MagicMock())
+        task_id = tm.add_task("First", "A", "15 min")
+        wrapped = with_table_diff(handlers.delete_task, 1, tm)
+
+        # Failed delete: nothing new since the session's last version
+        status, table, *_, version = wrapped("not-an-id", 1, tm.version)
+        self.assertIn("Error", status)
+        self.assertEqual(table, {"__type__": "update"})
+
+        status, table, *_, new_version = wrapped(str(task_id), 1, version)
+        self.assertEqual(table, [])
+
+        # The delete moved the version after it was read, so the next action re-sends once more
+        status, table, *_, last_version = wrapped("not-an-id", 1, new_version)
+        self.assertEqual(table, [])
+        self.assertEqual(last_version, tm.version)
+
+    def test_write_from_another_session_is_not_marked_seen(self):
+        from ui.layout import with_table_diff
+        tm = TaskManager(use_memory=True)
+        handlers = UIHandlers(tm, MagicMock(), MagicMock(), MagicMock())
+
+        def build_then_other_session_writes():
+            rows = handlers.get_task_dataframe()
+            tm.add_task("Added elsewhere", "A", "15 min")
+            return "ok", rows
+
+        wrapped = with_table_diff(build_then_other_session_writes, 1, tm)
+        _, rows, version = wrapped(tm.version)
+        self.assertEqual(rows, [])
+        self.assertLess(version, tm.version)
+
+        _, rows, _ = with_table_diff(lambda: ("ok", handlers.get_task_dataframe()), 1, tm)(version)
+        self.assertEqual([r[1] for r in rows], ["Added elsewhere"])
+
+    def test_skipped_table_keeps_seen_version(self):
+        from ui.layout import with_table_diff
+        tm = TaskManager(use_memory=True)
+        handlers = UIHandlers(tm, MagicMock(), MagicMock(), MagicMock())
+        wrapped = with_table_diff(handlers.delete_task, 1, tm)
+        tm.add_task("Added elsewhere", "A", "15 min")
+
+        # No selection: the table isn't sent, so the session must still refresh on its next event
+        status, table, *_, version = wrapped(None, 1, 0)
+        self.assertEqual(table, {"__type__": "update"})
+        self.assertEqual(version, 0)
+
+
+class TestIdleBackoff(unittest.TestCase):
+    def test_interval_doubles_and_caps(self):
+        from ui.layout import MAX_IDLE_INTERVAL, idle_backoff_interval
+        self.assertEqual([idle_backoff_interval(30, n) for n in range(5)], [30, 60, 120, 240, MAX_IDLE_INTERVAL])
+        # A base above the cap is never shortened
+        self.assertEqual(idle_backoff_interval(600, 3), 600)
+
+
+class TestAutoCheckToggle(unittest.TestCase):
+    def test_toggle_round_trip(self):
+        from ui.handlers import PAUSE_AUTO_CHECK_LABEL, START_AUTO_CHECK_LABEL, toggle_auto_check
+        timer, label, active = toggle_auto_check(False)
+        self.assertEqual((timer, label, active), ({"__type__": "update", "active": True}, PAUSE_AUTO_CHECK_LABEL, True))
+        timer, label, active = toggle_auto_check(active)
+        self.assertEqual((timer, label, active), ({"__type__": "update", "active": False}, START_AUTO_CHECK_LABEL, False))
+
+
+class TestTaskPagination(unittest.TestCase):
+    def test_pages_hold_page_size_rows(self):
+        tm = TaskManager(use_memory=True)
+        handlers = UIHandlers(tm, MagicMock(), MagicMock(), MagicMock())
+        handlers.TASK_PAGE_SIZE = 2
+        for i in range(5):
+            tm.add_task(f"Task {i}")
+
+        rows, page, _, info = handlers.go_to_task_page(3)
+        self.assertEqual([r[1] for r in rows], ["Task 4"])
+        self.assertEqual((page, info), (3, "Page 3 of 3"))
+
+        # Out-of-range pages are clamped
+        rows, page, _, _ = handlers.go_to_task_page(9)
+        self.assertEqual(page, 3)
+
+        # Emptying the last page falls back to the previous one, and write
+        # handlers report the new page count
+        status, rows, _, page, _, info = handlers.delete_task(rows[0][0], page)
+        self.assertEqual([r[1] for r in rows], ["Task 2", "Task 3"])
+        self.assertEqual((page, info), (2, "Page 2 of 2"))
+
+    def test_sessions_page_independently(self):
+        tm = TaskManager(use_memory=True)
+        handlers = UIHandlers(tm, MagicMock(), MagicMock(), MagicMock())
+        handlers.TASK_PAGE_SIZE = 2
+        for i in range(5):
+            tm.add_task(f"Task {i}")
+
+        handlers.go_to_task_page(3)
+        # Another session still on page 1 gets page 1 rows from its own actions
+        _, rows, _, page, _, info = handlers.add_new_task("Task 5", "", 30, "Todo", 1)[3:]
+        self.assertEqual([r[1] for r in rows], ["Task 0", "Task 1"])
+        self.assertEqual((page, info), (1, "Page 1 of 3"))
+
+
+class TestInitializeAgent(unittest.TestCase):
+    def test_agent_reused_until_env_changes(self):
+        from core.focus_check import FocusMonitor
+        monitor = FocusMonitor(MagicMock(), MagicMock(), MagicMock())
+        handlers = UIHandlers(TaskManager(use_memory=True), MagicMock(), MagicMock(), monitor)
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "sk-one", "DEMO_OPENAI_API_KEY": ""}):
+            status = handlers.initialize_agent("openai")
+            agent = monitor.focus_agent
+            self.assertEqual(handlers.initialize_agent("openai"), status)
+            self.assertIs(monitor.focus_agent, agent)
+
+            os.environ["OPENAI_API_KEY"] = "sk-two"
+            handlers.initialize_agent("openai")
+            self.assertIsNot(monitor.focus_agent, agent)
+
+    def test_unreachable_vllm_falls_back_and_retries(self):
+        from agent import FocusAgent, MockFocusAgent
+        from core.focus_check import FocusMonitor
+        monitor = FocusMonitor(MagicMock(), MagicMock(), MagicMock())
+        handlers = UIHandlers(TaskManager(use_memory=True), MagicMock(), MagicMock(), monitor)
+        with patch.object(FocusAgent, "check_connection", return_value=False):
+            _, provider = handlers.initialize_agent("vllm")
+        self.assertIsInstance(monitor.focus_agent, MockFocusAgent)
+        self.assertIn("MOCK", provider)
+
+        # Not remembered, so the next load probes the server again
+        with patch.object(FocusAgent, "check_connection", return_value=True):
+            _, provider = handlers.initialize_agent("vllm")
+        self.assertNotIsInstance(monitor.focus_agent, MockFocusAgent)
+        self.assertIn("VLLM", provider)
@@ -0,0 +1,74 @@
+import asyncio
+import os
+import queue
+import tempfile
+import unittest
+from unittest.mock import mock_open, patch
+
+from monitor import ContentAwareHandler, FileMonitor, _is_network_mount
+
+
+class TestFileMonitorSubscribe(unittest.TestCase):
+    def test_subscribers_receive_events(self):
+        fm = FileMonitor()
+        events = queue.Queue()
+        fm.subscribe(events)
+        with tempfile.TemporaryDirectory() as path:
+            fm.start(path)
+            try:
+                self.assertIsNone(events.get(timeout=1))  # start notification
+                # The watcher's own 'created' event must not debounce ours away
+                fm.handler.debounce_seconds = 0
+                target = os.path.join(path, "main.py")
+                with open(target, "w") as f:
+                    f.write("print('hi')")
+                fm.handler._create_event("modified", target)
+                event = events.get(timeout=1)
+                while event is None or (event["filename"], event["type"]) != ("main.py", "modified"):
+                    event = events.get(timeout=1)
+                self.assertEqual(event["summary"], "print('hi')")
+                self.assertEqual(event["formatted"], "• MODIFIED: main.py")
+            finally:
+                fm.unsubscribe(events)
+                # Drop watcher events that arrived before unsubscribing
+                while not events.empty():
+                    events.get_nowait()
+                fm.stop()
+        self.assertTrue(events.empty())
+
+    def test_asyncio_subscribers_receive_events(self):
+        fm = FileMonitor()
+
+        async def run():
+            events = asyncio.Queue()
+            fm.subscribe(events, asyncio.get_running_loop())
+            with tempfile.TemporaryDirectory() as path:
+                await asyncio.to_thread(fm.start, path)
+                try:
+                    self.assertIsNone(await asyncio.wait_for(events.get(), 1))
+                finally:
+                    fm.unsubscribe(events)
+                    fm.stop()
+            return events
+
+        self.assertTrue(asyncio.run(run()).empty())
+
+
+class TestContentAwareHandler(unittest.TestCase):
+    def test_event_buffer_keeps_newest(self):
+        handler = ContentAwareHandler()
+        handler.debounce_seconds = 0
+        for i in range(ContentAwareHandler.EVENT_BUFFER_SIZE + 5):
+            handler._create_event("deleted", f"/tmp/file{i}.py")
+        self.assertEqual(len(handler.events), ContentAwareHandler.EVENT_BUFFER_SIZE)
+        recent = handler.get_recent_events(2)
+        self.assertEqual([e["filename"] for e in recent], ["file53.py", "file54.py"])
+
+
+class TestNetworkMountDetection(unittest.TestCase):
+    def test_network_mount_detection(self):
+        mounts = "/dev/sda1 / ext4 rw 0 0\nserver:/export /mnt/share nfs4 rw 0 0\n"
+        with patch("builtins.open", mock_open(read_data=mounts)):
+            self.assertTrue(_is_network_mount("/mnt/share/project"))
+            self.assertFalse(_is_network_mount("/mnt/shared"))
+            self.assertFalse(_is_network_mount("/home/user"))
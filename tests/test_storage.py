@@ -3,6 +3,7 @@ Tests for TaskManager storage backends (SQLite and In-Memory).
 """
 import pytest
 import os
+from unittest.mock import patch
 from storage import TaskManager
 
 class TestTaskManagerStorage:
@@ -72,5 +73,110 @@ class TestTaskManagerStorage:
         t1_data = tm.get_task(t1)
         assert t1_data['status'] == 'Todo'
 
+    def test_version_bumps_on_writes(self):
+        """Every mutation bumps the version so cached views can be invalidated."""
+        tm = TaskManager(use_memory=True)
+        v0 = tm.version
+        task_id = tm.add_task("Versioned", "Description")
+        tm.set_active_task(task_id)
+        tm.update_task(task_id, status="Done")
+        tm.delete_task(task_id)
+        assert tm.version == v0 + 4
+        tm.get_all_tasks()
+        assert tm.version == v0 + 4
+
+    def test_task_rows_in_table_order(self):
+        """Rows come back as tuples in the task table's column order."""
+        db_path = "test_rows_focusflow.db"
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        for tm in (TaskManager(use_memory=True), TaskManager(db_path=db_path)):
+            tm.add_task("First", "A", "15 min")
+            tm.add_task("Second", "B", "20 min", status="Done")
+            rows = tm.get_all_tasks_rows()
+            assert [r[1:] for r in rows] == [("First", "A", "Todo", "15 min"),
+                                             ("Second", "B", "Done", "20 min")]
+        os.remove(db_path)
+
+    def test_add_tasks_bulk(self):
+        """Bulk inserts keep order and positions after existing tasks."""
+        db_path = "test_bulk_focusflow.db"
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        for tm in (TaskManager(use_memory=True), TaskManager(db_path=db_path)):
+            tm.add_task("Existing")
+            added = tm.add_tasks_bulk([("A", "a", "15 min", "Todo"), ("B", "b", "20 min", "Bogus")])
+            assert added == 2
+            tasks = tm.get_all_tasks()
+            assert [t['title'] for t in tasks] == ["Existing", "A", "B"]
+            assert [t['position'] for t in tasks] == [1, 2, 3]
+            assert tasks[2]['status'] == "Todo"
+        os.remove(db_path)
+
+    def test_task_counts(self):
+        """Total and done counts come back together from both backends."""
+        db_path = "test_counts_focusflow.db"
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        for tm in (TaskManager(use_memory=True), TaskManager(db_path=db_path)):
+            assert tm.get_task_counts() == (0, 0)
+            tm.add_task("First")
+            tm.add_task("Second", status="Done")
+            tm.add_task("Third", status="In Progress")
+            assert tm.get_task_counts() == (3, 1)
+            assert tm.get_status_counts() == {"Todo": 1, "Done": 1, "In Progress": 1}
+            # Counted once per write; callers get their own dict
+            with patch.object(tm, '_load_status_counts', side_effect=AssertionError("cache miss")):
+                tm.get_status_counts()["Done"] = 99
+                assert tm.get_task_counts() == (3, 1)
+            tm.delete_task(1)
+            assert tm.get_task_counts() == (2, 1)
+        os.remove(db_path)
+
+    def test_active_task_cached_until_write(self):
+        """The active task is looked up once per write, from both backends."""
+        db_path = "test_active_focusflow.db"
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        for tm in (TaskManager(use_memory=True), TaskManager(db_path=db_path)):
+            first = tm.add_task("First")
+            second = tm.add_task("Second")
+            tm.set_active_task(first)
+            assert tm.get_active_task()['id'] == first
+            with patch.object(tm, '_load_active_task', side_effect=AssertionError("cache miss")):
+                assert tm.get_active_task()['title'] == "First"
+            tm.get_active_task()['title'] = "Mutated"
+            assert tm.get_active_task()['title'] == "First"
+
+            tm.set_active_task(second)
+            assert tm.get_active_task()['id'] == second
+            tm.update_task(second, status="Done")
+            assert tm.get_active_task() is None
+        os.remove(db_path)
+
+    def test_write_during_read_is_not_cached_as_current(self):
+        """A write committing while a reader loads must not leave the reader's stale result cached."""
+        tm = TaskManager(use_memory=True)
+        task_id = tm.add_task("First")
+        load = tm._load_active_task
+
+        def load_then_write():
+            stale = load()
+            tm.set_active_task(task_id)
+            return stale
+
+        with patch.object(tm, '_load_active_task', side_effect=load_then_write):
+            assert tm.get_active_task() is None
+        assert tm.get_active_task()['id'] == task_id
+
+    def test_failed_write_keeps_version(self):
+        """Only writes that complete bump the version."""
+        tm = TaskManager(use_memory=True)
+        task_id = tm.add_task("First")
+        version = tm.version
+        with pytest.raises(ValueError):
+            tm.update_task(task_id, status="Bogus")
+        assert tm.version == version
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
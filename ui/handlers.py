@@ -4,9 +4,48 @@ UI Event Handlers for FocusFlow.
 import os
 import gradio as gr
 import pandas as pd
-from agent import FocusAgent, MockFocusAgent
+from agent import FocusAgent, MockFocusAgent, DEFAULT_VLLM_MODEL
+
+# Shared timer updates. Gradio only pops "value" from update dicts, so these
+# value-free updates are safe to return from every handler call.
+TIMER_ON = gr.update(active=True)
+TIMER_OFF = gr.update(active=False)
+
+# Auto-Check button labels; returned as plain strings, which set only the button text
+START_AUTO_CHECK_LABEL = "▶️ Start Auto-Check"
+PAUSE_AUTO_CHECK_LABEL = "⏸️ Pause Auto-Check"
+
+# Task button pressed with no row selected: the table view (see get_task_view) is unchanged
+_NO_SELECTION = ("⚠️ No task selected. Click a row in the table first.", *(gr.skip(),) * 5)
+# Timer, Auto-Check button, timer state and demo status when onboarding fails
+_ONBOARDING_UNCHANGED = (gr.skip(),) * 4
+
+
+# Longest exception text shown in a status line; the full error goes to the console
+ERROR_DETAIL_CHARS = 80
+
+
+def _error_status(e: Exception) -> str:
+    """Short UI status for a failed action, logging the full error server-side."""
+    print(f"⚠️ {type(e).__name__}: {e}")
+    return f"❌ Error: {str(e)[:ERROR_DETAIL_CHARS]}"
+
+
+def toggle_auto_check(active: bool) -> tuple:
+    """Flip a session's auto-check timer. Returns (timer update, button label, new state)."""
+    if active:
+        return TIMER_OFF, START_AUTO_CHECK_LABEL, False
+    return TIMER_ON, PAUSE_AUTO_CHECK_LABEL, True
+
+# Environment read by initialize_agent(); a change to any of them rebuilds the agent
+_AGENT_ENV_VARS = (
+    "ANTHROPIC_API_KEY", "DEMO_ANTHROPIC_API_KEY", "OPENAI_API_KEY", "DEMO_OPENAI_API_KEY",
+    "GEMINI_API_KEY", "DEMO_GEMINI_API_KEY", "VLLM_API_KEY", "VLLM_BASE_URL", "VLLM_MODEL",
+)
 
 class UIHandlers:
+    TASK_PAGE_SIZE = 50
+
     def __init__(self, task_manager, file_monitor, metrics_tracker, focus_monitor, linear_client=None):
         self.task_manager = task_manager
         self.file_monitor = file_monitor
@@ -16,9 +55,16 @@ class UIHandlers:
 
         # State
         self.monitoring_active = False
-        self.timer_active = False
         self.check_interval = 30 # Default
 
+        # Provider/env the current agent was built for, and its status message
+        self._agent_key = None
+        self._agent_status = None
+
+        # (task_manager.version, {page: rows}) for pages requested since the last write.
+        # The page itself is per-session gr.State, passed in by the layout.
+        self._task_rows = (None, {})
+
     def get_voice_status_ui(self) -> str:
         """Get voice integration status for UI display."""
         from voice import get_voice_status
@@ -26,9 +72,23 @@ class UIHandlers:
 
     def initialize_agent(self, ai_provider: str) -> tuple:
         """
-        Initialize the AI agent.
+        Initialize the AI agent, reusing the current one when the provider
+        and its environment are unchanged (e.g. on a browser reload).
         Returns: (status_message, actual_provider_display)
         """
+        key = (ai_provider, *(os.getenv(name) for name in _AGENT_ENV_VARS))
+        if key == self._agent_key and self.focus_monitor.focus_agent:
+            return self._agent_status
+
+        status = self._create_agent(ai_provider)
+        # An unreachable vLLM server falls back to the mock; retry on the next load
+        retry_later = ai_provider == "vllm" and isinstance(self.focus_monitor.focus_agent, MockFocusAgent)
+        self._agent_key = None if retry_later else key
+        self._agent_status = status
+        return status
+
+    def _create_agent(self, ai_provider: str) -> tuple:
+        """Build the agent for a provider, falling back to the mock agent."""
         try:
             use_mock = False
             focus_agent = None
@@ -84,9 +144,11 @@ class UIHandlers:
                         provider="vllm",
                         api_key=os.getenv("VLLM_API_KEY", "EMPTY"),
                         base_url=os.getenv("VLLM_BASE_URL", "http://localhost:8000/v1"),
-                        model=os.getenv("VLLM_MODEL", "ibm-granite/granite-4.0-h-1b")
+                        model=os.getenv("VLLM_MODEL", DEFAULT_VLLM_MODEL)
                     )
-                    if not focus_agent.connection_healthy:
+                    # Probe now so an unreachable server falls back to the mock (and
+                    # initialize_agent retries on the next load); later calls reuse the result
+                    if not focus_agent.check_connection():
                         use_mock = True
                     else:
                         self.focus_monitor.set_agent(focus_agent)
@@ -137,22 +199,19 @@ class UIHandlers:
         # Re-initialize Agent
         return self.initialize_agent(provider)
 
-    def process_onboarding(self, project_description: str) -> tuple:
+    def process_onboarding(self, project_description: str, page: int = 1) -> tuple:
         """Process onboarding and generate tasks."""
-        # Default UI updates for failure cases (no change to timer/monitoring)
-        no_update = gr.update()
-
         if not self.focus_monitor.focus_agent:
-            return "❌ Please initialize agent first", self.get_task_dataframe(), 0, no_update, no_update, no_update, no_update
-
-        if not project_description.strip():
-            return "❌ Please describe your project", self.get_task_dataframe(), 0, no_update, no_update, no_update, no_update
+            error = "❌ Please initialize agent first"
+        elif not project_description.strip():
+            error = "❌ Please describe your project"
+        else:
+            tasks = self.focus_monitor.focus_agent.get_onboarding_tasks(project_description)
+            error = None if tasks else "❌ Failed to generate tasks. Check your AI provider configuration."
 
-        # Generate tasks
-        tasks = self.focus_monitor.focus_agent.get_onboarding_tasks(project_description)
-
-        if not tasks:
-            return "❌ Failed to generate tasks. Check your AI provider configuration.", self.get_task_dataframe(), 0, no_update, no_update, no_update, no_update
+        if error:
+            # No change to timer/monitoring
+            return error, *self.get_task_view(page), *_ONBOARDING_UNCHANGED
 
         # Reset State (Demo Mode Reset)
         # We clear everything to give the user a fresh start
@@ -160,114 +219,161 @@ class UIHandlers:
         self.metrics_tracker.clear_all_data()
         self.stop_monitoring() # Stop backend monitoring
 
-        # Add tasks to database
-        for task in tasks:
-            self.task_manager.add_task(
-                title=task.get("title", "Untitled"),
-                description=task.get("description", ""),
-                estimated_duration=task.get("estimated_duration", "30 min")
-            )
+        # Add tasks to database in one batch
+        self.task_manager.add_tasks_bulk([
+            (task.get("title", "Untitled"), task.get("description", ""),
+             task.get("estimated_duration", "30 min"), "Todo")
+            for task in tasks
+        ])
 
         # Return success with UI resets
-        # Outputs: [onboard_status, task_table, progress_bar, monitor_timer, timer_toggle_btn, timer_active_state, demo_status]
+        # Outputs: [onboard_status, *task view, monitor_timer, timer_toggle_btn, timer_active_state, demo_status]
         return (
             f"✅ Generated {len(tasks)} tasks! Go to Task Manager to start.",
-            self.get_task_dataframe(),
-            self.calculate_progress(),
-            gr.update(active=False), # Stop timer
-            gr.update(value="▶️ Start Auto-Check"), # Reset button label
+            *self.get_task_view(1),
+            TIMER_OFF, # Stop timer
+            START_AUTO_CHECK_LABEL, # Reset button label
             False, # Reset timer state
             "⏹️ Monitoring reset (New Project)" # Update status
         )
 
-    def get_task_dataframe(self):
-        """Get tasks as a list for display."""
-        tasks = self.task_manager.get_all_tasks()
-        if not tasks:
-            return []
-
-        display_tasks = []
-        for task in tasks:
-            display_tasks.append([
-                task['id'],
-                task['title'],
-                task['description'],
-                task['status'],
-                task['estimated_duration']
-            ])
-        return display_tasks
+    def get_task_dataframe(self, page: int = 1):
+        """Rows of a 1-based task page (cached until the next task write)."""
+        page = self._clamp_page(page)
+        version = self.task_manager.version
+        cached_version, pages = self._task_rows
+        if cached_version != version:
+            pages = {}
+            self._task_rows = (version, pages)
+
+        rows = pages.get(page)
+        if rows is None:
+            # Rows come straight from storage in the table's column order
+            size = self.TASK_PAGE_SIZE
+            rows = pages[page] = self.task_manager.get_tasks_page((page - 1) * size, size)
+        return rows
+
+    def get_task_view(self, page: int = 1) -> tuple:
+        """
+        What every task handler returns for the table:
+        (rows, progress %, page, page, page info). The page goes to both the
+        session's page state and the page box, after clamping to the page count.
+        """
+        page = self._clamp_page(page)
+        return self.get_task_dataframe(page), self.calculate_progress(), page, page, self._page_info(page)
 
-    def calculate_progress(self) -> float:
-        """Calculate overall task completion percentage."""
-        tasks = self.task_manager.get_all_tasks()
-        if not tasks:
-            return 0.0
+    def get_task_page_count(self) -> int:
+        """Number of task table pages (at least one)."""
+        total, _ = self.task_manager.get_task_counts()
+        return max(1, -(-total // self.TASK_PAGE_SIZE))
 
-        completed = sum(1 for task in tasks if task['status'] == "Done")
-        return (completed / len(tasks)) * 100
+    def _clamp_page(self, page) -> int:
+        # Deleting rows can leave a page past the end
+        return min(max(int(page or 1), 1), self.get_task_page_count())
 
-    def add_new_task(self, title: str, description: str, duration: int, status: str) -> tuple:
+    def _page_info(self, page: int) -> str:
+        return f"Page {page} of {self.get_task_page_count()}"
+
+    def go_to_task_page(self, page) -> tuple:
+        """Show a 1-based page of the task table. Returns (rows, page, page, page_info)."""
+        rows, _, page, _, info = self.get_task_view(page)
+        return rows, page, page, info
+
+    def calculate_progress(self) -> float:
+        """Calculate overall task completion percentage (counts are cached by the task manager)."""
+        total, done = self.task_manager.get_task_counts()
+        return (done / total) * 100 if total else 0.0
+
+    def add_new_task(self, title: str, description: str, duration: int, status: str, page: int = 1) -> tuple:
         """Add a new task."""
         if not title.strip():
-            return "", "", 30, "Todo", self.get_task_dataframe(), self.calculate_progress()
+            # Nothing was saved: keep the form as typed and leave the table view alone
+            return (gr.skip(),) * 9
 
         duration_str = f"{duration} min"
         self.task_manager.add_task(title, description, duration_str, status)
-        return "", "", 30, "Todo", self.get_task_dataframe(), self.calculate_progress()
+        return "", "", 30, "Todo", *self.get_task_view(page)
 
-    def delete_task(self, task_id: str) -> tuple:
-        """Delete a task by ID."""
+    def _task_action(self, task_id, page, apply, success: str, failure: str = None,
+                     reset_verdicts: bool = True) -> tuple:
+        """
+        Shared body of the task buttons: apply(int_id) to the selected task and
+        return (status, *task view). apply returning False reports `failure`.
+        """
+        if task_id in (None, ""):
+            return _NO_SELECTION
         try:
-            self.task_manager.delete_task(int(task_id))
-            return "✅ Task deleted", self.get_task_dataframe(), self.calculate_progress()
+            if apply(int(task_id)) is False:
+                status = failure
+            else:
+                if reset_verdicts:
+                    self._reset_verdicts()
+                status = success
         except Exception as e:
-            return f"❌ Error: {str(e)}", self.get_task_dataframe(), self.calculate_progress()
+            status = _error_status(e)
+        return status, *self.get_task_view(page)
+
+    def delete_task(self, task_id: str, page: int = 1) -> tuple:
+        """Delete a task by ID."""
+        return self._task_action(task_id, page, self.task_manager.delete_task, "✅ Task deleted",
+                                 reset_verdicts=False)
 
-    def set_task_active(self, task_id: str) -> tuple:
+    def _reset_verdicts(self):
+        """Drop cached focus verdicts so the next check asks the agent afresh."""
+        if self.focus_monitor.focus_agent:
+            self.focus_monitor.focus_agent.clear_verdict_cache()
+
+    def set_task_active(self, task_id: str, page: int = 1) -> tuple:
         """Set a task as active."""
-        try:
-            self.task_manager.set_active_task(int(task_id))
-            return "✅ Task set as active! Start working and I'll monitor your progress.", self.get_task_dataframe(), self.calculate_progress()
-        except Exception as e:
-            return f"❌ Error: {str(e)}", self.get_task_dataframe(), self.calculate_progress()
+        return self._task_action(
+            task_id, page, self.task_manager.set_active_task,
+            "✅ Task set as active! Start working and I'll monitor your progress.",
+            "⚠️ Task not found or already done."
+        )
 
-    def mark_task_done(self, task_id: str) -> tuple:
+    def mark_task_done(self, task_id: str, page: int = 1) -> tuple:
         """Mark a task as completed."""
-        try:
-            self.task_manager.update_task(int(task_id), status="Done")
-            return "✅ Task marked as completed! 🎉", self.get_task_dataframe(), self.calculate_progress()
-        except Exception as e:
-            return f"❌ Error: {str(e)}", self.get_task_dataframe(), self.calculate_progress()
+        return self._task_action(
+            task_id, page, lambda i: self.task_manager.update_task(i, status="Done"),
+            "✅ Task marked as completed! 🎉"
+        )
 
     def start_monitoring(self, watch_path: str, launch_mode: str) -> tuple:
         """Start file monitoring."""
         if launch_mode == "demo":
-            return "❌ File monitoring disabled in demo mode. Use the text area instead.", gr.update(active=False)
+            return "❌ File monitoring disabled in demo mode. Use the text area instead.", TIMER_OFF
 
-        if not watch_path or not os.path.exists(watch_path):
+        if not watch_path or not os.path.isdir(watch_path):
             self.monitoring_active = False
-            self.timer_active = False
-            return f"❌ Invalid path: {watch_path}", gr.update(active=False)
+            return f"❌ Invalid path: {watch_path}", TIMER_OFF
 
         try:
             self.file_monitor.start(watch_path)
+            self._reset_verdicts()
             self.monitoring_active = True
-            self.timer_active = True
-            return f"✅ Monitoring started on: {watch_path}", gr.update(active=True)
+            return f"✅ Monitoring started on: {watch_path}", TIMER_ON
         except Exception as e:
             self.monitoring_active = False
-            self.timer_active = False
-            return f"❌ Error: {str(e)}", gr.update(active=False)
+            return _error_status(e), TIMER_OFF
 
     def stop_monitoring(self) -> tuple:
         """Stop file monitoring."""
-        self.file_monitor.stop()
+        # Nothing to stop unless start_monitoring() succeeded; this also keeps demo-mode
+        # onboarding from loading the (lazily imported) file watcher just to stop it
+        if self.monitoring_active:
+            self.file_monitor.stop()
+        self._reset_verdicts()
         self.monitoring_active = False
-        self.timer_active = False
-        return "⏹️ Monitoring stopped", gr.update(active=False)
+        return "⏹️ Monitoring stopped", TIMER_OFF
 
-    def set_check_interval(self, frequency_label: str) -> tuple:
-        """Update check interval based on dropdown selection."""
+    def set_check_interval(self, frequency_label: str, interval_factor: int = 1) -> tuple:
+        """
+        Update check interval based on dropdown selection.
+
+        The session's timer runs at interval_factor times the check interval
+        (local mode's timer is only an idle fallback behind file events).
+        Returns: (timer update, status message, timer interval)
+        """
         frequency_map = {
             "30 seconds": 30,
             "1 minute": 60,
@@ -276,10 +382,12 @@ class UIHandlers:
         }
 
         self.check_interval = frequency_map.get(frequency_label, 30)
-        # Return updated timer component
+        timer_interval = self.check_interval * interval_factor
+        # Only the interval is sent; each session's timer keeps its own on/off state
         return (
-            gr.Timer(value=self.check_interval, active=self.timer_active),
-            f"✅ Check interval set to {frequency_label}"
+            gr.Timer(value=timer_interval),
+            f"✅ Check interval set to {frequency_label}",
+            timer_interval
         )
 
     def refresh_dashboard(self) -> tuple:
@@ -320,28 +428,21 @@ class UIHandlers:
         choices = [(p['name'], p['id']) for p in projects]
         return gr.update(choices=choices, value=choices[0][1] if choices else None, visible=True), f"✅ Found {len(projects)} projects"
 
-    def import_linear_tasks_ui(self, project_id):
+    def import_linear_tasks_ui(self, project_id, page: int = 1):
         """Import tasks from selected Linear project."""
         if not self.linear_client:
-             return "⚠️ Linear client not initialized", self.get_task_dataframe(), self.calculate_progress()
+             return "⚠️ Linear client not initialized", *self.get_task_view(page)
 
         if not project_id:
-            return "❌ Select a project first", self.get_task_dataframe(), self.calculate_progress()
+            return "❌ Select a project first", *self.get_task_view(page)
 
         tasks = self.linear_client.get_project_tasks(project_id)
         if not tasks:
-            return "⚠️ No open tasks found in this project", self.get_task_dataframe(), self.calculate_progress()
-
-        count = 0
-        for t in tasks:
-            estimate = t.get('estimate', 30) or 30
-            duration_str = f"{estimate} min"
-            self.task_manager.add_task(
-                title=t['title'],
-                description=t.get('description', ''),
-                estimated_duration=duration_str,
-                status="Todo"
-            )
-            count += 1
-
-        return f"✅ Imported {count} tasks from Linear!", self.get_task_dataframe(), self.calculate_progress()
+            return "⚠️ No open tasks found in this project", *self.get_task_view(page)
+
+        count = self.task_manager.add_tasks_bulk([
+            (t['title'], t.get('description', ''), f"{t.get('estimate', 30) or 30} min", "Todo")
+            for t in tasks
+        ])
+
+        return f"✅ Imported {count} tasks from Linear!", *self.get_task_view(page)
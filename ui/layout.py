@@ -3,9 +3,52 @@ Gradio Layout for FocusFlow.
 """
 import gradio as gr
 import os
+import asyncio
+import time
 import inspect
+from functools import lru_cache
 from core.pomodoro import PomodoroTimer
-import mcp_tools
+from ui.handlers import START_AUTO_CHECK_LABEL, PAUSE_AUTO_CHECK_LABEL, toggle_auto_check
+
+# In local mode focus checks are triggered by file events; the timer only
+# catches idle stretches, so it runs this many times slower
+IDLE_CHECK_FACTOR = 10
+# Minimum seconds between event-triggered focus checks
+EVENT_CHECK_MIN_GAP = 5.0
+
+# Upper bound for the focus-check interval while the user stays idle
+MAX_IDLE_INTERVAL = 300
+
+
+def idle_backoff_interval(base: float, idle_ticks: int) -> float:
+    """Timer interval after idle_ticks consecutive Idle verdicts: doubles each time, capped."""
+    return max(base, min(base * 2 ** idle_ticks, MAX_IDLE_INTERVAL))
+
+# Short chime shared by the Pomodoro and focus-nudge <audio> elements
+_ALERT_WAV_URI = "data:audio/wav;base64,UklGRnoGAABXQVZFZm10IBAAAAABAAEAQB8AAEAfAAABAAgAZGF0YQoGAACBhYqFbF1fdJivrJBhNjVgodDbq2EcBj+a2/LDciUFLIHO8tiJNwgZaLvt559NEAxQp+PwtmMcBjiR1/LMeSwFJHfH8N2QQAoUXrTp66hVFApGn+DyvmwhBSuBzvLZiTUI"
+_ALERT_AUDIO_HTML = (
+    f'<audio id="pomodoro-alert" preload="auto"><source src="{_ALERT_WAV_URI}" type="audio/wav"></audio>'
+    f'<audio id="nudge-alert" preload="auto"><source src="{_ALERT_WAV_URI}" type="audio/wav"></audio>'
+)
+
+# Plays the end-of-session chime when a Pomodoro session completes
+_POMODORO_SOUND_JS = """
+<script>
+(function() {
+    const audio = document.getElementById('pomodoro-alert');
+    if (audio) { audio.play(); }
+})();
+</script>
+"""
+
+# Value-free updates (Gradio only pops "value"), so one shared dict serves every call
+_HIDDEN = gr.update(visible=False)
+
+
+@lru_cache(maxsize=64)
+def _alert_html(alert_js: str) -> str:
+    """Wrap an alert script for the hidden HTML trigger; the same few nudges repeat."""
+    return f'<script>{alert_js}</script>'
 
 def register_tool_safely(func):
     """Register a tool with correct signature by creating dummy components."""
@@ -27,32 +70,65 @@ def register_tool_safely(func):
     btn = gr.Button(f"cmd_{func.__name__}", visible=False)
     btn.click(fn=func, inputs=inputs, outputs=[output])
 
-def create_app(ui_handlers, pomodoro_timer: PomodoroTimer, launch_mode: str, ai_provider: str, monitor_interval: int):
+def with_table_diff(fn, table_index: int, task_manager):
+    """
+    Wrap a handler so the task table is only re-sent when it changed.
+
+    The wrapped handler takes the session's last-seen task version as an extra
+    trailing input and returns the current version as an extra trailing output;
+    when they match, the table slot becomes gr.skip() instead of the full rows.
+    """
+    def wrapper(*args):
+        *inputs, seen_version = args
+        # Read before the rows are built, so a write from another session in between
+        # can't be recorded as seen; at worst the next action re-sends the table
+        version = task_manager.version
+        outputs = list(fn(*inputs))
+        if gr.utils.is_prop_update(outputs[table_index]):
+            # The handler skipped the table, so the session still shows what it last saw
+            return (*outputs, seen_version)
+        if version == seen_version == task_manager.version:
+            outputs[table_index] = gr.skip()
+        return (*outputs, version)
+    return wrapper
+
+def create_app(ui_handlers, pomodoro_timer: PomodoroTimer, launch_mode: str, ai_provider: str, monitor_interval: int,
+               enable_mcp: bool = True):
     """Create the Gradio Blocks app."""
 
     with gr.Blocks(title="FocusFlow AI") as app:
 
         # MCP Tools Registration (Hidden)
-        with gr.Row(visible=False):
-            # Register all tools from mcp_tools
-            register_tool_safely(mcp_tools.add_task)
-            register_tool_safely(mcp_tools.get_current_task)
-            register_tool_safely(mcp_tools.start_task)
-            register_tool_safely(mcp_tools.mark_task_done)
-            register_tool_safely(mcp_tools.get_all_tasks)
-            register_tool_safely(mcp_tools.delete_task)
-            register_tool_safely(mcp_tools.update_task)
-            register_tool_safely(mcp_tools.get_productivity_stats)
+        if enable_mcp:
+            import mcp_tools
+            with gr.Row(visible=False):
+                # Register all tools from mcp_tools
+                register_tool_safely(mcp_tools.add_task)
+                register_tool_safely(mcp_tools.get_current_task)
+                register_tool_safely(mcp_tools.start_task)
+                register_tool_safely(mcp_tools.mark_task_done)
+                register_tool_safely(mcp_tools.get_all_tasks)
+                register_tool_safely(mcp_tools.delete_task)
+                register_tool_safely(mcp_tools.update_task)
+                register_tool_safely(mcp_tools.get_productivity_stats)
 
         # Hidden component for browser alerts
         alert_trigger = gr.HTML(visible=False)
 
-        # Auto-refresh timer for monitoring (default 30s)
-        monitor_timer = gr.Timer(value=monitor_interval, active=False)
+        # Auto-refresh timer for monitoring (default 30s). Local mode reacts to
+        # file events directly, so the timer there is only an idle fallback.
+        timer_interval = monitor_interval if launch_mode == "demo" else monitor_interval * IDLE_CHECK_FACTOR
+        # Demo mode auto-checks from the start; built active so no load event is needed
+        monitor_timer = gr.Timer(value=timer_interval, active=(launch_mode == "demo"))
 
         # State to track timer status (Active by default in Demo, Inactive in Local)
         timer_active_state = gr.State(value=(launch_mode == "demo"))
 
+        # Consecutive Idle verdicts seen by this session's timer (drives the idle backoff)
+        idle_ticks = gr.State(value=0)
+        # Interval this session's timer backs off from, as set by Check Frequency
+        timer_base = gr.State(value=timer_interval)
+
         # Dedicated 1-second timer for Pomodoro
         pomodoro_ticker = gr.Timer(value=1, active=True)
 
@@ -89,7 +165,8 @@ def create_app(ui_handlers, pomodoro_timer: PomodoroTimer, launch_mode: str, ai_
                 with gr.Row():
                     gr.Markdown(f"**Mode:** `{launch_mode.upper()}`")
                     ai_provider_display
-                    gr.Markdown(f"**Check Interval:** `{monitor_interval}s`")
+                    gr.Markdown(f"**Check Interval:** `{timer_interval}s`"
+                                if launch_mode == "demo" else "**Check Interval:** `on file change`")
 
                 if launch_mode == "demo":
                     gr.Markdown("""
@@ -192,6 +269,19 @@ def create_app(ui_handlers, pomodoro_timer: PomodoroTimer, launch_mode: str, ai_
                     interactive=False,
                     wrap=True
                 )
+                # Task version this session's table last received (see with_table_diff)
+                task_table_version = gr.State(value=None)
+
+                # Pagination: only one page of rows is sent at a time
+                with gr.Row():
+                    prev_page_btn = gr.Button("◀ Prev", size="sm", scale=1)
+                    task_page_input = gr.Number(label="Page", value=1, precision=0, minimum=1, scale=1)
+                    task_page_info = gr.Markdown("Page 1 of 1")
+                    next_page_btn = gr.Button("Next ▶", size="sm", scale=1)
+                # This session's 1-based table page
+                task_page = gr.State(value=1)
+                # Outputs matching UIHandlers.get_task_view()
+                task_view = [task_table, progress_bar, task_page, task_page_input, task_page_info]
 
                 selection_info = gr.Markdown("_Click **+ Add Task** to create a new task, or click a row above to edit._")
 
@@ -270,6 +360,7 @@ def create_app(ui_handlers, pomodoro_timer: PomodoroTimer, launch_mode: str, ai_
                     start_monitor_btn = gr.State(value=None) # Dummy
                     stop_monitor_btn = gr.State(value=None) # Dummy
                     monitor_status = gr.State(value=None) # Dummy
+                    activity_display = gr.State(value=None) # Dummy
                 else:
                     gr.Markdown("**Directory Monitoring**")
                     watch_path_input = gr.Textbox(
@@ -281,6 +372,7 @@ def create_app(ui_handlers, pomodoro_timer: PomodoroTimer, launch_mode: str, ai_
                         start_monitor_btn = gr.Button("▶️ Start", variant="primary", size="sm")
                         stop_monitor_btn = gr.Button("⏹️ Stop", variant="stop", size="sm")
                     monitor_status = gr.Textbox(label="Status", interactive=False)
+                    activity_display = gr.Textbox(label="Recent File Activity", lines=5, interactive=False)
                     demo_textarea = gr.State(value=None) # Dummy
                     demo_update_btn = gr.State(value=None) # Dummy
                     demo_status = gr.State(value=None) # Dummy
@@ -294,10 +386,16 @@ def create_app(ui_handlers, pomodoro_timer: PomodoroTimer, launch_mode: str, ai_
                     interactive=True
                 )
 
+                def set_check_frequency(frequency_label):
+                    factor = 1 if launch_mode == "demo" else IDLE_CHECK_FACTOR
+                    # A new frequency starts again from its base, without any idle backoff
+                    return (*ui_handlers.set_check_interval(frequency_label, factor), 0)
+
                 check_frequency.change(
-                    fn=ui_handlers.set_check_interval,
+                    fn=set_check_frequency,
                     inputs=[check_frequency],
-                    outputs=[monitor_timer, monitor_status if launch_mode != "demo" else demo_status],
+                    outputs=[monitor_timer, monitor_status if launch_mode != "demo" else demo_status,
+                             timer_base, idle_ticks],
                     api_name=False
                 )
 
@@ -307,14 +405,7 @@ def create_app(ui_handlers, pomodoro_timer: PomodoroTimer, launch_mode: str, ai_
                 # Timer display with embedded audio alerts
                 with gr.Row():
                     pomodoro_display = gr.Markdown(value=pomodoro_timer.get_display(), elem_id="pomodoro-display")
-                    gr.HTML("""
-                    <audio id="pomodoro-alert" preload="auto">
-                        <source src="data:audio/wav;base64,UklGRnoGAABXQVZFZm10IBAAAAABAAEAQB8AAEAfAAABAAgAZGF0YQoGAACBhYqFbF1fdJivrJBhNjVgodDbq2EcBj+a2/LDciUFLIHO8tiJNwgZaLvt559NEAxQp+PwtmMcBjiR1/LMeSwFJHfH8N2QQAoUXrTp66hVFApGn+DyvmwhBSuBzvLZiTUI" type="audio/wav">
-                    </audio>
-                    <audio id="nudge-alert" preload="auto">
-                        <source src="data:audio/wav;base64,UklGRnoGAABXQVZFZm10IBAAAAABAAEAQB8AAEAfAAABAAgAZGF0YQoGAACBhYqFbF1fdJivrJBhNjVgodDbq2EcBj+a2/LDciUFLIHO8tiJNwgZaLvt559NEAxQp+PwtmMcBjiR1/LMeSwFJHfH8N2QQAoUXrTp66hVFApGn+DyvmwhBSuBzvLZiTUI" type="audio/wav">
-                    </audio>
-                    """)
+                    gr.HTML(_ALERT_AUDIO_HTML)
 
                 with gr.Row():
                     pomodoro_start_btn = gr.Button("▶️ Start", size="sm", scale=1)
@@ -342,9 +433,9 @@ def create_app(ui_handlers, pomodoro_timer: PomodoroTimer, launch_mode: str, ai_
                 with gr.Row():
                     manual_check_btn = gr.Button("🔍 Run Focus Check Now", variant="secondary")
                     if launch_mode == "demo":
-                        timer_toggle_btn = gr.Button("⏸️ Pause Auto-Check", variant="secondary")
+                        timer_toggle_btn = gr.Button(PAUSE_AUTO_CHECK_LABEL, variant="secondary")
                     else:
-                        timer_toggle_btn = gr.Button("▶️ Start Auto-Check", variant="secondary")
+                        timer_toggle_btn = gr.Button(START_AUTO_CHECK_LABEL, variant="secondary")
 
         # --- Event Handlers ---
 
@@ -355,9 +446,10 @@ def create_app(ui_handlers, pomodoro_timer: PomodoroTimer, launch_mode: str, ai_
         # Onboarding
         # Onboarding
         generate_btn.click(
-            fn=ui_handlers.process_onboarding,
-            inputs=[project_input],
-            outputs=[onboard_status, task_table, progress_bar, monitor_timer, timer_toggle_btn, timer_active_state, demo_status],
+            fn=with_table_diff(ui_handlers.process_onboarding, 1, ui_handlers.task_manager),
+            inputs=[project_input, task_page, task_table_version],
+            outputs=[onboard_status, *task_view, monitor_timer, timer_toggle_btn, timer_active_state, demo_status,
+                     task_table_version],
             api_name=False
         )
 
@@ -368,9 +460,9 @@ def create_app(ui_handlers, pomodoro_timer: PomodoroTimer, launch_mode: str, ai_
             api_name=False
         )
         import_linear_btn.click(
-            fn=ui_handlers.import_linear_tasks_ui,
-            inputs=[project_selector],
-            outputs=[onboard_status, task_table, progress_bar],
+            fn=with_table_diff(ui_handlers.import_linear_tasks_ui, 1, ui_handlers.task_manager),
+            inputs=[project_selector, task_page, task_table_version],
+            outputs=[onboard_status, *task_view, task_table_version],
             api_name=False
         )
 
@@ -381,101 +473,175 @@ def create_app(ui_handlers, pomodoro_timer: PomodoroTimer, launch_mode: str, ai_
             api_name=False
         )
         form_cancel_btn.click(
-            fn=lambda: gr.update(visible=False),
+            fn=lambda: _HIDDEN,
             outputs=task_form,
             api_name=False
         )
+        save_task = with_table_diff(ui_handlers.add_new_task, 4, ui_handlers.task_manager)
+
+        def save_task_form(title, *rest):
+            # One event for save + hide; a blank title saves nothing and keeps the form open
+            hide = _HIDDEN if title.strip() else gr.skip()
+            return (*save_task(title, *rest), hide)
+
         form_save_btn.click(
-            fn=ui_handlers.add_new_task,
-            inputs=[form_title, form_desc, form_duration, form_status],
-            outputs=[form_title, form_desc, form_duration, form_status, task_table, progress_bar],
-            api_name=False
-        )
-        form_save_btn.click(
-            fn=lambda: gr.update(visible=False),
-            outputs=task_form,
+            fn=save_task_form,
+            inputs=[form_title, form_desc, form_duration, form_status, task_page, task_table_version],
+            outputs=[form_title, form_desc, form_duration, form_status, *task_view, task_table_version, task_form],
+            show_progress="hidden",
             api_name=False
         )
 
+        # Task table pagination
+        # Local reads/writes finish in milliseconds; skip the loading overlay on the table
+        page_outputs = [task_table, task_page, task_page_input, task_page_info]
+        task_page_input.submit(fn=ui_handlers.go_to_task_page, inputs=[task_page_input],
+                               outputs=page_outputs, show_progress="hidden", api_name=False)
+        prev_page_btn.click(fn=lambda page: ui_handlers.go_to_task_page(page - 1),
+                            inputs=[task_page], outputs=page_outputs, show_progress="hidden", api_name=False)
+        next_page_btn.click(fn=lambda page: ui_handlers.go_to_task_page(page + 1),
+                            inputs=[task_page], outputs=page_outputs, show_progress="hidden", api_name=False)
+
         # Task Selection Handler
-        def on_select_task(evt: gr.SelectData, data):
-            try:
-                # data is a pandas DataFrame
-                row_index = evt.index[0]
-                task_id = data.iloc[row_index][0] # ID is in first column
-                return task_id, f"✅ Selected Task ID: {task_id}"
-            except Exception as e:
-                return None, f"❌ Error selecting task: {str(e)}"
+        def on_select_task(evt: gr.SelectData):
+            # The event carries the clicked row, so the table isn't sent back as an input
+            if not evt.row_value:
+                return None, "❌ Error selecting task: no row selected"
+            # ID is in the first column; cast once here so the task buttons get an int
+            task_id = int(evt.row_value[0])
+            return task_id, f"✅ Selected Task ID: {task_id}"
 
         task_table.select(
             fn=on_select_task,
-            inputs=[task_table],
             outputs=[selected_task_id, selection_info],
             api_name=False
         )
 
         # Button Handlers
         start_task_btn.click(
-            fn=ui_handlers.set_task_active,
-            inputs=[selected_task_id],
-            outputs=[onboard_status, task_table, progress_bar],
+            fn=with_table_diff(ui_handlers.set_task_active, 1, ui_handlers.task_manager),
+            inputs=[selected_task_id, task_page, task_table_version],
+            outputs=[onboard_status, *task_view, task_table_version],
+            show_progress="hidden",
             api_name=False
         )
 
         mark_done_btn.click(
-            fn=ui_handlers.mark_task_done,
-            inputs=[selected_task_id],
-            outputs=[onboard_status, task_table, progress_bar],
+            fn=with_table_diff(ui_handlers.mark_task_done, 1, ui_handlers.task_manager),
+            inputs=[selected_task_id, task_page, task_table_version],
+            outputs=[onboard_status, *task_view, task_table_version],
+            show_progress="hidden",
             api_name=False
         )
 
         delete_task_btn.click(
-            fn=ui_handlers.delete_task,
-            inputs=[selected_task_id],
-            outputs=[onboard_status, task_table, progress_bar],
+            fn=with_table_diff(ui_handlers.delete_task, 1, ui_handlers.task_manager),
+            inputs=[selected_task_id, task_page, task_table_version],
+            outputs=[onboard_status, *task_view, task_table_version],
+            show_progress="hidden",
             api_name=False
         )
 
         # Monitoring
+        async def run_focus_update(events):
+            """Run one focus check; returns (focus log, alert html, voice update, activity summary)."""
+            focus_result, alert_js, voice_data = await ui_handlers.focus_monitor.run_check_async(events)
+            alert_html = _alert_html(alert_js) if alert_js else ""
+            voice_update = gr.update(visible=True, value=voice_data) if voice_data else _HIDDEN
+            activity = (ui_handlers.focus_monitor.get_activity_summary(ui_handlers.monitoring_active, events)
+                        if events is not None else None)
+            return focus_result, alert_html, voice_update, activity
+
         if launch_mode == "demo":
+            # New text is activity: drop any idle backoff so it's checked promptly
             demo_update_btn.click(
-                fn=ui_handlers.focus_monitor.update_demo_text,
-                inputs=[demo_textarea],
-                outputs=[demo_status],
+                fn=lambda text, base: (ui_handlers.focus_monitor.update_demo_text(text), gr.update(value=base), 0),
+                inputs=[demo_textarea, timer_base],
+                outputs=[demo_status, monitor_timer, idle_ticks],
                 api_name=False
             )
-            # Auto-activate timer in demo mode
-            app.load(fn=lambda: gr.update(active=True), outputs=monitor_timer, api_name=False)
-
-            # Toggle handler for demo mode
-            def toggle_demo_timer(active):
-                new_state = not active
-                btn_label = "▶️ Start Auto-Check" if active else "⏸️ Pause Auto-Check"
-                return gr.update(active=new_state), gr.update(value=btn_label), new_state
-
-            # We need a state to track timer status for the button label
-            # timer_active_state is defined at top of function
 
+            # Toggle handler for demo mode; timer_active_state tracks it for the button label.
+            # Timer toggles are instant; queue=False answers them in one plain
+            # request instead of a queue join plus event stream
             timer_toggle_btn.click(
-                fn=toggle_demo_timer,
+                fn=toggle_auto_check,
                 inputs=[timer_active_state],
                 outputs=[monitor_timer, timer_toggle_btn, timer_active_state],
+                queue=False,
                 api_name=False
             )
 
         else:
+            # Sessions that paused Auto-Check. The event stream can't take new inputs once
+            # it's running, so the toggle records the pause here for it to read.
+            paused_sessions = set()
+
+            def start_monitoring_wrapper(path, request: gr.Request):
+                # Starting turns the session's timer back on, so it's no longer paused
+                paused_sessions.discard(request.session_hash)
+                return ui_handlers.start_monitoring(path, launch_mode)
+
             start_monitor_btn.click(
-                fn=lambda p: ui_handlers.start_monitoring(p, launch_mode),
+                fn=start_monitoring_wrapper,
                 inputs=[watch_path_input],
                 outputs=[monitor_status, monitor_timer],
+                queue=False,
                 api_name=False
             )
             stop_monitor_btn.click(
                 fn=ui_handlers.stop_monitoring,
                 outputs=[monitor_status, monitor_timer],
+                queue=False,
                 api_name=False
             )
 
+            # Push file activity as the watcher reports it instead of polling,
+            # and run the focus check on the same trigger
+            async def activity_stream(request: gr.Request):
+                session = request.session_hash
+                # Delivered on this loop, so waiting doesn't hold a worker thread per session
+                events = asyncio.Queue()
+                ui_handlers.file_monitor.subscribe(events, asyncio.get_running_loop())
+                try:
+                    last = ui_handlers.focus_monitor.get_activity_summary(ui_handlers.monitoring_active)
+                    yield last, gr.skip(), gr.skip(), gr.skip()
+                    last_log = None
+                    last_check = 0.0
+                    while True:
+                        await events.get()
+                        # Coalesce a burst of saves into a single update
+                        await asyncio.sleep(1.0)
+                        while not events.empty():
+                            events.get_nowait()
+
+                        if not ui_handlers.monitoring_active or session in paused_sessions:
+                            summary = ui_handlers.focus_monitor.get_activity_summary(False)
+                            if summary != last:
+                                last = summary
+                                yield summary, gr.skip(), gr.skip(), gr.skip()
+                            continue
+
+                        wait = last_check + EVENT_CHECK_MIN_GAP - time.monotonic()
+                        if wait > 0:
+                            await asyncio.sleep(wait)
+                        last_check = time.monotonic()
+                        focus_result, alert_html, voice_update, summary = await run_focus_update(
+                            ui_handlers.file_monitor.get_recent_activity(10))
+                        activity_update = gr.skip() if summary == last else summary
+                        # Checks only ever append to the log, so an unchanged result is already on the page
+                        log_update = gr.skip() if focus_result == last_log else focus_result
+                        last, last_log = summary, focus_result
+                        yield activity_update, log_update, alert_html, voice_update
+                finally:
+                    ui_handlers.file_monitor.unsubscribe(events)
+                    paused_sessions.discard(session)
+
+            # The stream never finishes, so it mustn't hold one of the event's default
+            # concurrency slots: with the default limit of 1 a second session would wait forever
+            app.load(fn=activity_stream, outputs=[activity_display, focus_log, alert_trigger, voice_audio],
+                     show_progress="hidden", concurrency_limit=None, api_name=False)
+
             # Toggle handler for local mode (if needed, but local mode uses start/stop buttons)
             # The button is present in local mode too: "Start Auto-Check"
             # But local mode logic is tied to file monitoring start/stop.
@@ -483,18 +649,20 @@ def create_app(ui_handlers, pomodoro_timer: PomodoroTimer, launch_mode: str, ai_
             # or just pause the timer while keeping monitoring active?
             # Given the button label "Start Auto-Check", it seems redundant with "Start" button in Monitor tab.
             # But let's make it toggle the timer.
-
-            def toggle_local_timer(active):
-                new_state = not active
-                btn_label = "▶️ Start Auto-Check" if active else "⏸️ Pause Auto-Check"
-                return gr.update(active=new_state), gr.update(value=btn_label), new_state
-
-            # timer_active_state is defined at top of function
+            def toggle_local_auto_check(active, request: gr.Request):
+                outputs = toggle_auto_check(active)
+                # Pausing also stops the checks triggered by file events
+                if outputs[2]:
+                    paused_sessions.discard(request.session_hash)
+                else:
+                    paused_sessions.add(request.session_hash)
+                return outputs
 
             timer_toggle_btn.click(
-                fn=toggle_local_timer,
+                fn=toggle_local_auto_check,
                 inputs=[timer_active_state],
                 outputs=[monitor_timer, timer_toggle_btn, timer_active_state],
+                queue=False,
                 api_name=False
             )
 
@@ -505,42 +673,62 @@ def create_app(ui_handlers, pomodoro_timer: PomodoroTimer, launch_mode: str, ai_
         pomodoro_reset_btn.click(fn=pomodoro_timer.reset, outputs=pomodoro_display, api_name=False)
 
         # Pomodoro Tick (1 second)
-        pomodoro_ticker.tick(fn=pomodoro_timer.tick, outputs=[pomodoro_display, alert_trigger])
-        # Note: tick returns (display, should_play_sound).
-        # But alert_trigger is HTML. I need a wrapper.
+        # Display text this session last received from the ticker
+        pomodoro_last = gr.State(value=None)
 
-        def pomodoro_tick_wrapper():
+        def pomodoro_tick_wrapper(last_display):
             display, play_sound = pomodoro_timer.tick()
-            js = ""
-            if play_sound:
-                js = """
-                <script>
-                (function() {
-                    const audio = document.getElementById('pomodoro-alert');
-                    if (audio) { audio.play(); }
-                })();
-                </script>
-                """
-            return display, js
-
-        pomodoro_ticker.tick(fn=pomodoro_tick_wrapper, outputs=[pomodoro_display, alert_trigger], api_name=False)
+            # A paused timer re-renders the same text every second; skip it
+            display_update = gr.skip() if display == last_display else display
+            return display_update, (_POMODORO_SOUND_JS if play_sound else gr.skip()), display
+
+        pomodoro_ticker.tick(fn=pomodoro_tick_wrapper, inputs=[pomodoro_last],
+                             outputs=[pomodoro_display, alert_trigger, pomodoro_last],
+                             show_progress="hidden", api_name=False)
 
         # Focus Check Tick (Monitor Interval)
-        def monitor_tick_wrapper():
-            focus_result, alert_js, voice_data = ui_handlers.focus_monitor.run_check()
-            alert_html = f'<script>{alert_js}</script>' if alert_js else ""
-            voice_update = gr.update(visible=True, value=voice_data) if voice_data else gr.update(visible=False)
-            return focus_result, alert_html, voice_update
+        # (focus log, activity summary) hashes this session last received
+        tick_hashes = gr.State(value=(None, None))
+
+        async def monitor_tick_wrapper(last_hashes):
+            # One snapshot of the watcher buffer per tick (unused in demo mode)
+            events = ui_handlers.file_monitor.get_recent_activity(10) if launch_mode != "demo" else None
+            focus_result, alert_html, voice_update, activity = await run_focus_update(events)
+
+            # Don't re-send textareas whose content this session already shows
+            hashes = (hash(focus_result), hash(activity))
+            focus_update = gr.skip() if hashes[0] == last_hashes[0] else focus_result
+            activity_update = gr.skip() if activity is None or hashes[1] == last_hashes[1] else activity
+            return focus_update, alert_html, voice_update, activity_update, hashes
+
+        async def timer_tick_wrapper(last_hashes, idle_count, base):
+            outputs = await monitor_tick_wrapper(last_hashes)
+            # Back off while idle; any other verdict restores the base interval
+            new_count = min(idle_count + 1, 16) if ui_handlers.focus_monitor.last_verdict == "Idle" else 0
+            new_interval = idle_backoff_interval(base, new_count)
+            timer_update = (gr.skip() if new_interval == idle_backoff_interval(base, idle_count)
+                            else gr.update(value=new_interval))
+            return (*outputs, timer_update, new_count)
 
         monitor_timer.tick(
-            fn=monitor_tick_wrapper,
-            outputs=[focus_log, alert_trigger, voice_audio],
+            fn=timer_tick_wrapper,
+            inputs=[tick_hashes, idle_ticks, timer_base],
+            outputs=[focus_log, alert_trigger, voice_audio, activity_display, tick_hashes, monitor_timer, idle_ticks],
+            show_progress="hidden",
             api_name=False
         )
 
+        async def manual_check_wrapper(last_hashes):
+            # Show the check is running right away; the verdict follows when the agent answers
+            log = ui_handlers.focus_monitor.activity_log_text
+            yield (f"{log}\n⏳ Checking..." if log else "⏳ Checking..."), gr.skip(), gr.skip(), gr.skip(), gr.skip()
+            # The placeholder replaced the log, so the final log must not be skipped
+            yield await monitor_tick_wrapper((None, last_hashes[1]))
+
         manual_check_btn.click(
-            fn=monitor_tick_wrapper,
-            outputs=[focus_log, alert_trigger, voice_audio],
+            fn=manual_check_wrapper,
+            inputs=[tick_hashes],
+            outputs=[focus_log, alert_trigger, voice_audio, activity_display, tick_hashes],
             api_name=False
         )
 